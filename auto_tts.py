@@ -1,14 +1,27 @@
 import os
 import re
+import sys
+import json
+import time
+import random
+import hashlib
+import itertools
+import threading
 import uuid
 import shutil
+import subprocess
+import tempfile
+import wave
+import shlex
+import string
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Callable, List
 
-from dotenv import load_dotenv
-from openai import OpenAI
-import requests
-from pydub import AudioSegment
+# openai, requests, pydub and dotenv are imported where they are used, so
+# that `import auto_tts` stays cheap and has no side effects.
 
 # ------------------ Konfiguration / Pfade ------------------
 BASE_DIR     = Path(__file__).parent
@@ -20,24 +33,327 @@ PARTS_DIR    = BASE_DIR / "audio_parts"
 OUT_DIR      = BASE_DIR / "output"
 IMAGES_DIR   = BASE_DIR / "images"
 PROJECTS_DIR = BASE_DIR / "projects"
+CACHE_DIR    = BASE_DIR / "tts_cache"
+ASSETS_DIR   = BASE_DIR / "assets"
+SEARCH_CACHE_FILE = BASE_DIR / "search_cache.json"
+CALIBRATION_FILE = BASE_DIR / "calibration.json"
 
-for p in (DRAFT_DIR, APPROVED_DIR, PARTS_DIR, OUT_DIR, IMAGES_DIR, PROJECTS_DIR):
-    p.mkdir(exist_ok=True)
+def ensure_dirs():
+    """Arbeitsordner anlegen (vor dem ersten Schreiben aufrufen)."""
+    for p in (DRAFT_DIR, APPROVED_DIR, PARTS_DIR, OUT_DIR, IMAGES_DIR, PROJECTS_DIR, CACHE_DIR):
+        p.mkdir(exist_ok=True)
 
 # ------------------ ENV laden ------------------
-load_dotenv()  # .env im gleichen Ordner
+# .env im gleichen Ordner (oder darüber); dotenv nur laden, wenn es eine gibt
+if any((d / ".env").exists() for d in (BASE_DIR, *BASE_DIR.parents)):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
 ELEVEN_KEY = os.getenv("ELEVEN_API_KEY")
 VOICE_ID   = os.getenv("ELEVEN_VOICE_ID", "IrMGt4vHCJZmo2JER29o")
 GPT_MODEL  = os.getenv("GPT_MODEL", "gpt-4o")
-
-# average characters spoken per minute; used for multi-topic mode
+ELEVEN_API = os.getenv("ELEVEN_API_BASE", "https://api.elevenlabs.io")
+
+# parallel GPT requests in --topics mode
+GPT_WORKERS = int(os.getenv("OPENAI_CONCURRENCY", "4"))
+# stream scripts in --topics runs and start TTS per finished block
+GPT_STREAM = os.getenv("GPT_STREAM", "0") == "1"
+# prices for the usage ledger: USD per million GPT tokens (cached prompt
+# tokens are cheaper) and per 1000 ElevenLabs characters
+OPENAI_PRICE_IN = float(os.getenv("OPENAI_PRICE_IN", "2.50"))
+OPENAI_PRICE_CACHED = float(os.getenv("OPENAI_PRICE_CACHED", "1.25"))
+OPENAI_PRICE_OUT = float(os.getenv("OPENAI_PRICE_OUT", "10.00"))
+ELEVEN_PRICE_1K = float(os.getenv("ELEVEN_PRICE_1K", "0.30"))
+# rough size of a token, for estimates before a call
+CHARS_PER_TOKEN = 4
+# budget of a run (0 = unlimited): TTS characters and total cost in USD
+MAX_CHARS = int(os.getenv("MAX_CHARS", "0"))
+MAX_COST = float(os.getenv("MAX_COST", "0"))
+# parallel ElevenLabs requests; match the concurrency limit of your plan
+TTS_WORKERS = int(os.getenv("ELEVEN_CONCURRENCY", "3"))
+# retries per chunk on rate limits (429), 5xx answers and dropped connections
+TTS_RETRIES = 5
+TTS_BACKOFF = 2.0
+TTS_MODEL = "eleven_multilingual_v2"
+VOICE_SETTINGS = {"stability": 0.45, "similarity_boost": 0.8, "speed": 1.0}
+# upper bound for the on-disk TTS cache, oldest entries are evicted first
+TTS_CACHE_MB = int(os.getenv("ELEVEN_CACHE_MB", "2048"))
+# responses smaller than this cannot be a usable MP3 chunk
+TTS_MIN_BYTES = 256
+STREAM_CHUNK = 64 * 1024
+# TTS engine: "elevenlabs", "command" (local CLI such as espeak-ng or piper)
+# or "fake" (silence proportional to the text, for benchmarks and CI)
+TTS_BACKENDS = ("elevenlabs", "command", "fake")
+TTS_BACKEND = os.getenv("TTS_BACKEND", "elevenlabs")
+# command for the "command" backend: text on stdin, WAV to {out} or stdout
+TTS_COMMAND = os.getenv("TTS_COMMAND", "espeak-ng --stdout")
+FAKE_RATE = 16000
+# pause inserted after every part by merge_parts(), and between topics
+MERGE_PAUSE_MS = int(os.getenv("MERGE_PAUSE_MS", "350"))
+TOPIC_PAUSE_MS = int(os.getenv("TOPIC_PAUSE_MS", "1000"))
+# optional clean-up of every part while merging (needs numpy): silence
+# quieter than TRIM_DB is cut from both ends except TRIM_KEEP_MS, then the
+# part is brought to TARGET_LUFS, by at most MAX_GAIN_DB and with its peaks
+# kept below PEAK_DB
+POSTPROCESS = os.getenv("POSTPROCESS", "0") == "1"
+TRIM_DB = -50.0
+TRIM_KEEP_MS = 80
+TARGET_LUFS = float(os.getenv("TARGET_LUFS", "-16"))
+MAX_GAIN_DB = 12.0
+PEAK_DB = -1.0
+# "speed": frame-level MP3 concat, no re-encoding
+# "size": lossless WAV intermediates, one final encode at SIZE_BITRATE
+MERGE_MODES = ("speed", "size")
+MERGE_MODE = os.getenv("MERGE_MODE", "speed")
+SIZE_BITRATE = os.getenv("SIZE_BITRATE", "96k")
+# processes that merge the topics of a --topics run side by side
+MERGE_PROCESSES = int(os.getenv("MERGE_PROCESSES", "0")) or os.cpu_count() or 1
+
+# --batch: projects worked on at once, seconds after which the lock of a
+# crashed worker may be taken over, and how often live locks are refreshed
+BATCH_PROJECTS = int(os.getenv("BATCH_PROJECTS", "2"))
+BATCH_LOCK_STALE = 600
+BATCH_HEARTBEAT = 60
+
+# average characters spoken per minute; used until a voice is calibrated
 CHARS_PER_MIN = 700
+# seconds of rendered audio needed before the measured speaking rate of a
+# voice replaces CHARS_PER_MIN, and roughly how many seconds it averages over
+CALIBRATION_MIN_SECONDS = 120
+CALIBRATION_WINDOW = 3 * 3600
+# accepted deviation of a generated script from its character target
+LENGTH_TOLERANCE = 0.15
+# extra GPT attempts for a script outside the tolerance
+LENGTH_RETRIES = 2
 USER_AGENT = os.getenv("USER_AGENT", "yt_auto_tts/1.0 (+https://example.com)")
+WIKIMEDIA_API = os.getenv("WIKIMEDIA_API", "https://commons.wikimedia.org/w/api.php")
+UNSPLASH_API  = os.getenv("UNSPLASH_API", "https://api.unsplash.com/search/photos")
+# parallel search requests per image provider
+IMAGE_WORKERS = {"wikimedia": 4, "unsplash": 2}
+# titles per Wikimedia imageinfo request (API limit for normal users)
+WIKIMEDIA_BATCH = 50
+# width of the scaled preview URL requested from Wikimedia
+THUMB_WIDTH = 500
+# seconds a cached search result stays valid
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", str(7 * 24 * 3600)))
+
+# shared HTTP layer (see request()): retries after the first attempt, base
+# delay in seconds (doubled per attempt, with jitter) and its upper bound
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "4"))
+HTTP_BACKOFF = 1.0
+HTTP_MAX_DELAY = 60.0
+HTTP_TIMEOUT = 30
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+# consecutive failures after which a host is skipped, and for how long
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN = 60.0
+
+# ------------------ Metriken ------------------
+class Metrics:
+    """Stage timings and counters of one run, written as ``metrics.json``.
+
+    :meth:`stage` adds the wall time of a block to a named stage; stages that
+    run on several threads at once are summed, so e.g. ``tts`` can exceed
+    the total run time. :meth:`count` adds to a named counter (bytes, retries,
+    cache hits, tokens).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.perf_counter()
+            self.stages = {}
+            self.counters = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                entry = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+                entry["seconds"] += elapsed
+                entry["calls"] += 1
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @staticmethod
+    def _peak_rss_mb(who: str) -> float | None:
+        try:
+            import resource
+        except ImportError:  # Windows
+            return None
+        peak = resource.getrusage(getattr(resource, who)).ru_maxrss
+        # ru_maxrss is in KiB on Linux, in bytes on macOS
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {name: {"seconds": round(e["seconds"], 4), "calls": e["calls"]}
+                      for name, e in self.stages.items()}
+            return {
+                "wall_seconds": round(time.perf_counter() - self.started, 4),
+                "stages": stages,
+                "counters": dict(self.counters),
+                "peak_rss_mb": self._peak_rss_mb("RUSAGE_SELF"),
+                "peak_rss_children_mb": self._peak_rss_mb("RUSAGE_CHILDREN"),
+            }
+
+    def write(self, path: Path) -> Path:
+        path.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+        return path
+
+METRICS = Metrics()
+
+# ------------------ Kosten / Budget ------------------
+def gpt_cost(prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    return ((prompt_tokens - cached_tokens) * OPENAI_PRICE_IN
+            + cached_tokens * OPENAI_PRICE_CACHED
+            + completion_tokens * OPENAI_PRICE_OUT) / 1_000_000
+
+def tts_cost(chars: int, backend: str | None = None) -> float:
+    return chars * ELEVEN_PRICE_1K / 1000 if (backend or TTS_BACKEND) == "elevenlabs" else 0.0
+
+class BudgetExceeded(RuntimeError):
+    """Billable work was refused because it would break the run's budget."""
+
+class Usage:
+    """Billable usage of this process: every GPT call and TTS block.
+
+    Before a billable request its expected size is held with :meth:`held`,
+    which raises :class:`BudgetExceeded` if what was spent plus everything
+    held would pass ``max_chars`` (TTS characters) or ``max_cost`` (USD);
+    0 means no limit. Work already running is finished, nothing new starts.
+    :meth:`record` books the actual usage in :attr:`entries`;
+    :meth:`flush` appends the ones not yet written to a project's
+    ``ledger.jsonl``.
+    """
 
-if not OPENAI_KEY or not ELEVEN_KEY:
-    raise SystemExit("❌ OPENAI_API_KEY oder ELEVEN_API_KEY fehlt in .env")
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, max_chars: int = 0, max_cost: float = 0.0):
+        with self._lock:
+            self.max_chars, self.max_cost = max_chars, max_cost
+            self.entries, self._pending = [], []
+            self.chars, self.cost = 0, 0.0
+            self._held_chars, self._held_cost = 0, 0.0
+
+    def check(self, chars: int = 0, cost: float = 0.0):
+        """Raise :class:`BudgetExceeded` unless *chars* and *cost* still fit."""
+        with self._lock:
+            self._check(chars, cost)
+
+    def _check(self, chars: int, cost: float):
+        if self.max_chars and self.chars + self._held_chars + chars > self.max_chars:
+            raise BudgetExceeded(f"Budget von {self.max_chars} TTS-Zeichen erreicht "
+                                 f"({self.chars} verbraucht, {chars} angefragt)")
+        if self.max_cost and self.cost + self._held_cost + cost > self.max_cost:
+            raise BudgetExceeded(f"Budget von ${self.max_cost:.2f} erreicht "
+                                 f"(${self.cost:.2f} verbraucht, ${cost:.2f} angefragt)")
+
+    @contextmanager
+    def held(self, chars: int = 0, cost: float = 0.0):
+        with self._lock:
+            self._check(chars, cost)
+            self._held_chars += chars
+            self._held_cost += cost
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._held_chars -= chars
+                self._held_cost -= cost
+
+    def record(self, kind: str, project: str, **entry):
+        entry = dict(kind=kind, project=project, time=round(time.time(), 3), **entry)
+        entry["cost"] = round(entry.get("cost", 0.0), 6)
+        with self._lock:
+            self.entries.append(entry)
+            self._pending.append(entry)
+            if kind == "tts" and not entry.get("cached"):
+                self.chars += entry.get("chars", 0)
+            self.cost += entry["cost"]
+
+    @staticmethod
+    def totals(entries) -> dict:
+        t = {"tts_chars": 0, "tts_cached_chars": 0, "prompt_tokens": 0,
+             "cached_tokens": 0, "completion_tokens": 0, "cost": 0.0, "saved": 0.0}
+        for e in entries:
+            if e["kind"] == "tts":
+                t["tts_cached_chars" if e.get("cached") else "tts_chars"] += e["chars"]
+            else:
+                for k in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+                    t[k] += e.get(k, 0)
+            t["cost"] += e.get("cost", 0.0)
+            t["saved"] += e.get("saved", 0.0)
+        t["cost"], t["saved"] = round(t["cost"], 4), round(t["saved"], 4)
+        return t
+
+    def flush(self, path: Path, project: str | None = None) -> dict:
+        """Append the entries of *project* (all if ``None``) to the ledger
+        at *path*; return their totals."""
+        with self._lock:
+            keep, out = [], []
+            for e in self._pending:
+                mine = project is None or slugify(e["project"]) == slugify(project)
+                (out if mine else keep).append(e)
+            self._pending = keep
+        if out:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in out)
+        return self.totals(out)
+
+USAGE = Usage()
+
+def read_ledger(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines if line.strip()]
+
+def format_usage(t: dict) -> str:
+    return (f"{t['tts_chars']} TTS-Zeichen (+{t['tts_cached_chars']} aus Cache), "
+            f"{t['prompt_tokens']}/{t['completion_tokens']} Tokens, "
+            f"${t['cost']:.2f} (${t['saved']:.2f} gespart)")
+
+def close_ledger(path: Path, project: str | None = None):
+    """Book this run's usage into the ledger at *path* and print it."""
+    run = USAGE.flush(path, project)
+    print(f"💰 Dieser Lauf: {format_usage(run)}")
+    print(f"💰 Projekt gesamt: {format_usage(Usage.totals(read_ledger(path)))}")
+
+def estimate_usage(tts_chars: int, scripts: int = 0, char_target: int = 0) -> dict:
+    """Expected usage of *scripts* generations of about *char_target*
+    characters and *tts_chars* characters for TTS."""
+    prompt_tokens = completion_tokens = 0
+    if scripts:
+        system, suffix = load_prompt()
+        prompt_tokens = scripts * (len(system) + len(suffix)) // CHARS_PER_TOKEN
+        completion_tokens = scripts * char_target // CHARS_PER_TOKEN
+    return {
+        "tts_chars": tts_chars,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost": round(gpt_cost(prompt_tokens, completion_tokens) + tts_cost(tts_chars), 4),
+    }
+
+def preflight(estimate: dict):
+    """Print *estimate* and refuse to start if it can't fit the budget."""
+    print(f"💰 Schätzung: {estimate['tts_chars']} TTS-Zeichen, "
+          f"{estimate['prompt_tokens']}/{estimate['completion_tokens']} Tokens, "
+          f"~${estimate['cost']:.2f}")
+    USAGE.check(estimate["tts_chars"], estimate["cost"])
 
 # ------------------ Helper ------------------
 def read_prompt_template() -> str:
@@ -45,20 +361,214 @@ def read_prompt_template() -> str:
         raise FileNotFoundError(f"Prompt-Template fehlt: {PROMPT_FILE}")
     return PROMPT_FILE.read_text(encoding="utf-8")
 
-def generate_script(topic: str, char_target: int) -> str:
-    """ Holt das Skript von GPT """
-    client = OpenAI(api_key=OPENAI_KEY)
-    tmpl = read_prompt_template()
-    prompt = tmpl.format(topic=topic, char_target=char_target)
+PROMPT_FIELDS = {"topic", "char_target"}
 
-    resp = client.chat.completions.create(
-        model=GPT_MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.9,
-    )
+def _escape_format(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+def split_prompt_template(tmpl: str) -> tuple[str, str]:
+    """Split *tmpl* into a constant prefix and a small per-topic template.
+
+    The prefix is everything up to the paragraph containing the first
+    placeholder, already unescaped; it is identical for every topic and is
+    sent as the system message so provider-side prompt caching applies. The
+    returned suffix is still a ``str.format`` template.
+    """
+    pieces = list(string.Formatter().parse(tmpl))
+    fields = {field for _, field, _, _ in pieces if field is not None}
+    if fields != PROMPT_FIELDS:
+        raise ValueError(
+            f"Prompt-Template braucht genau {sorted(PROMPT_FIELDS)}, gefunden {sorted(fields)}"
+        )
+
+    first = next(i for i, piece in enumerate(pieces) if piece[1] is not None)
+    head = "".join(literal for literal, _, _, _ in pieces[:first + 1])
+    cut = head.rfind("\n\n")
+    cut = cut + 2 if cut >= 0 else 0
+    prefix = head[:cut]
+
+    suffix = _escape_format(head[cut:])
+    for i, (literal, field, spec, conv) in enumerate(pieces[first:]):
+        if i > 0:
+            suffix += _escape_format(literal)
+        if field is not None:
+            suffix += "{" + field + (f"!{conv}" if conv else "") + (f":{spec}" if spec else "") + "}"
+    return prefix.strip(), suffix.strip()
+
+@lru_cache(maxsize=1)
+def load_prompt() -> tuple[str, str]:
+    """Read, validate and split the prompt template once per process."""
+    return split_prompt_template(read_prompt_template())
+
+class ConfigError(RuntimeError):
+    """A key or optional package the run needs is missing.
+
+    Raised instead of :class:`SystemExit`, so it also surfaces from worker
+    threads; the CLI turns it into an exit message.
+    """
+
+def check_config(gpt: bool = False, tts: bool = False, postprocess: bool = False,
+                 backend: str | None = None):
+    """Raise :class:`ConfigError` before any work starts if the run can't finish."""
+    if gpt and not OPENAI_KEY:
+        raise ConfigError("OPENAI_API_KEY fehlt in .env")
+    if tts and (backend or TTS_BACKEND) == "elevenlabs" and not ELEVEN_KEY:
+        raise ConfigError("ELEVEN_API_KEY fehlt in .env")
+    if postprocess:
+        _numpy()
+
+_client_lock = threading.Lock()
+_client = None
+
+def openai_client():
+    """Return the process-wide OpenAI client (connections are reused)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if not OPENAI_KEY:
+                raise ConfigError("OPENAI_API_KEY fehlt in .env")
+            from openai import OpenAI
+            # the SDK retries with backoff itself and honours Retry-After
+            _client = OpenAI(api_key=OPENAI_KEY, max_retries=HTTP_RETRIES)
+        return _client
+
+def _log_usage(topic: str, resp, elapsed: float):
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        print(f"🧮 GPT '{topic}': {elapsed:.1f}s")
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+    METRICS.count("gpt_prompt_tokens", usage.prompt_tokens)
+    METRICS.count("gpt_cached_tokens", cached)
+    METRICS.count("gpt_completion_tokens", usage.completion_tokens)
+    USAGE.record("gpt", topic, model=GPT_MODEL, prompt_tokens=usage.prompt_tokens,
+                 cached_tokens=cached, completion_tokens=usage.completion_tokens,
+                 cost=gpt_cost(usage.prompt_tokens, usage.completion_tokens, cached))
+    print(f"🧮 GPT '{topic}': {usage.prompt_tokens} Prompt-Tokens "
+          f"({cached} aus Cache), {usage.completion_tokens} Antwort-Tokens, "
+          f"{elapsed:.1f}s")
+
+def _create_completion(client, topic: str, char_target: int, **kwargs):
+    """Send the prompt for *topic* through the circuit breaker of the host."""
+    system, suffix = load_prompt()
+    prompt = suffix.format(topic=topic, char_target=char_target)
+    breaker = circuit_breaker(str(getattr(client, "base_url", "") or "openai"))
+    breaker.check()
+    try:
+        resp = client.chat.completions.create(
+            model=GPT_MODEL,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.9,
+            **kwargs,
+        )
+    except Exception as e:
+        import openai
+
+        # connection problems (including timeouts) and 5xx count against
+        # the host; 4xx and errors on our side don't
+        if isinstance(e, openai.APIConnectionError) or (
+                isinstance(e, openai.APIStatusError) and e.status_code >= 500):
+            breaker.failure()
+        raise
+    breaker.success()
+    return resp
+
+def _gpt_estimate(char_target: int) -> float:
+    """Expected cost of one generation, held against the budget meanwhile."""
+    return estimate_usage(0, 1, char_target)["cost"]
+
+def generate_script(topic: str, char_target: int, client=None) -> str:
+    """ Holt das Skript von GPT (``client`` ersetzt den gemeinsamen Client) """
+    client = client or openai_client()
+    started = time.perf_counter()
+    with USAGE.held(cost=_gpt_estimate(char_target)):
+        with METRICS.stage("gpt"):
+            resp = _create_completion(client, topic, char_target)
+        _log_usage(topic, resp, time.perf_counter() - started)
     text = resp.choices[0].message.content.strip()
     return text
 
+def stream_script(topic: str, char_target: int, client=None):
+    """Yield the script for *topic* piece by piece while GPT writes it.
+
+    Token usage is logged when the stream ends. Closing the generator early
+    closes the HTTP stream, so the rest of the answer isn't generated; the
+    tokens received until then are booked as an estimate.
+    """
+    client = client or openai_client()
+    started = time.perf_counter()
+    last = None
+    received = 0
+    with USAGE.held(cost=_gpt_estimate(char_target)), METRICS.stage("gpt"):
+        stream = _create_completion(client, topic, char_target, stream=True,
+                                    stream_options={"include_usage": True})
+        try:
+            for chunk in stream:
+                last = chunk
+                if chunk.choices:
+                    piece = chunk.choices[0].delta.content
+                    if piece:
+                        received += len(piece)
+                        yield piece
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            _log_usage(topic, last, time.perf_counter() - started)
+            if getattr(last, "usage", None) is None and received:
+                estimate = estimate_usage(0, 1, received)
+                USAGE.record("gpt", topic, model=GPT_MODEL, estimated=True,
+                             prompt_tokens=estimate["prompt_tokens"],
+                             completion_tokens=estimate["completion_tokens"],
+                             cost=estimate["cost"])
+
+def trim_script(text: str, max_chars: int) -> str:
+    """Cut *text* to at most *max_chars* at a paragraph or sentence boundary."""
+    if len(text) <= max_chars:
+        return text
+    head = text[:max_chars + 1]
+    for pattern in (r"\n\s*\n", _SPLIT_LEVELS[0].pattern):
+        ends = [m.start() for m in re.finditer(pattern, head)]
+        if ends and ends[-1] > max_chars // 2:
+            return head[:ends[-1]].rstrip()
+    return head[:max_chars].rstrip()
+
+def generate_checked_script(topic: str, char_target: int, client=None) -> str:
+    """Generate a script and make sure its length is near *char_target*.
+
+    Scripts more than :data:`LENGTH_TOLERANCE` off the target are generated
+    again (up to :data:`LENGTH_RETRIES` times), asking for a target corrected
+    by how far the previous attempt missed. The closest attempt wins; if it
+    is still too long it is trimmed at a paragraph or sentence boundary, so
+    no TTS is paid for text that would be cut anyway.
+    """
+    lo = char_target * (1 - LENGTH_TOLERANCE)
+    hi = char_target * (1 + LENGTH_TOLERANCE)
+    ask = char_target
+    best = None
+    for attempt in range(LENGTH_RETRIES + 1):
+        text = generate_script(topic, ask, client)
+        if best is None or abs(len(text) - char_target) < abs(len(best) - char_target):
+            best = text
+        if lo <= len(text) <= hi:
+            break
+        if attempt < LENGTH_RETRIES:
+            METRICS.count("gpt_length_retries")
+            print(f"📏 '{topic}': {len(text)} Zeichen statt {char_target}, "
+                  f"generiere neu …")
+            ratio = min(2.0, max(0.5, char_target / max(1, len(text))))
+            ask = max(1, round(ask * ratio))
+    if len(best) > hi:
+        print(f"✂️ '{topic}': kürze {len(best)} auf höchstens {int(hi)} Zeichen")
+        best = trim_script(best, int(hi))
+    elif len(best) < lo:
+        print(f"⚠️ '{topic}': nur {len(best)} von {char_target} Zeichen")
+    return best
+
 def save_text(path: Path, text: str):
     path.write_text(text, encoding="utf-8")
 
@@ -77,87 +587,528 @@ def load_topics(value: str) -> List[str]:
         return [line.strip() for line in lines if line.strip()]
     return [t.strip() for t in value.split(",") if t.strip()]
 
-def calc_target_per_topic(n: int, chars_per_min: int = CHARS_PER_MIN, minutes: int = 60) -> int:
-    total = chars_per_min * minutes
-    return max(1, total // n)
+def calc_target_per_topic(n: int, chars_per_min: float | None = None, minutes: int = 60,
+                          max_chunk: int = 2500, pause_ms: int = MERGE_PAUSE_MS) -> int:
+    """Characters per topic so that *n* topics fill *minutes* of audio.
 
-def split_text_blocks(text: str, max_chars: int = 2500):
-    """ Teilt Text an Absatzgrenzen, damit ElevenLabs-Limits nicht reißen """
-    paras = [p.strip() for p in text.split("\n\n") if p.strip()]
-    blocks, current = [], ""
-    for p in paras:
-        if len(current) + len(p) + 2 > max_chars:
-            if current:
-                blocks.append(current.strip())
-            current = p
-        else:
-            current = (current + "\n\n" + p) if current else p
-    if current.strip():
-        blocks.append(current.strip())
+    ``chars_per_min`` defaults to the calibrated rate of the current voice
+    (see :class:`Calibration`). The pauses :func:`merge_parts` adds after
+    every block of up to *max_chunk* characters are taken off the time.
+    """
+    if chars_per_min is None:
+        chars_per_min = CALIBRATION.chars_per_min(voice_key())
+    per_sec = chars_per_min / 60
+    total = per_sec * minutes * 60 / (1 + per_sec * pause_ms / 1000 / max_chunk)
+    return max(1, int(total // n))
+
+# boundaries tried in order when a paragraph alone exceeds the chunk limit
+_SPLIT_LEVELS = (
+    re.compile(r"(?<=[.!?…])\s+|(?<=[.!?…][\"'”’)\]])\s+"),  # Sätze
+    re.compile(r"(?<=[,;:])\s+|\s+(?=[—–-]\s)"),                # Nebensätze
+    re.compile(r"\s+"),                                         # Wörter
+)
+# number of blocks buffered by iter_text_blocks() before emitting
+SPLIT_WINDOW = 8
+
+def _paragraphs(source):
+    """Yield the stripped paragraphs of a string or an iterable of lines."""
+    lines = source.splitlines() if isinstance(source, str) else source
+    current = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            current.append(line)
+        elif current:
+            yield "\n".join(current).strip()
+            current = []
+    if current:
+        yield "\n".join(current).strip()
+
+def _split_long(text: str, max_chars: int, level: int = 0) -> list:
+    """Split *text* into ``(separator, piece)`` pairs of at most *max_chars*.
+
+    Sentence boundaries are preferred, then clauses, then words; a word that
+    is still too long is cut hard.
+    """
+    if len(text) <= max_chars:
+        return [("", text)]
+    if level == len(_SPLIT_LEVELS):
+        return [("", text[i:i + max_chars]) for i in range(0, len(text), max_chars)]
+    out = []
+    pieces = [p for p in _SPLIT_LEVELS[level].split(text) if p]
+    for j, piece in enumerate(pieces):
+        sub = _split_long(piece, max_chars, level + 1)
+        if j:
+            sub[0] = (" ", sub[0][1])
+        out.extend(sub)
+    return out
+
+def _pack(units: list, cap: int) -> list:
+    """Greedily group *units* into blocks of at most *cap* characters."""
+    blocks, current, size = [], [], 0
+    for sep, text in units:
+        extra = len(text) + (len(sep) if current else 0)
+        if current and size + extra > cap:
+            blocks.append(current)
+            current, size = [], 0
+            extra = len(text)
+        current.append((sep, text))
+        size += extra
+    if current:
+        blocks.append(current)
     return blocks
 
-def search_wikimedia_images(query, limit: int = 3) -> List[dict]:
-    """Search Wikimedia Commons for freely licensed images.
+def _pack_balanced(units: list, max_chars: int) -> list:
+    """Pack *units* into the fewest blocks, with the longest block minimal.
 
-    ``query`` may be a single string or a list of strings. The API will be
-    queried sequentially until at least ``limit`` unique images are collected
-    or all queries are exhausted. A list of dictionaries with ``title``, ``url``
-    and ``license`` is returned.
+    Greedy packing already gives the minimum number of blocks; the smallest
+    cap that still achieves it spreads the text evenly instead of leaving a
+    tiny trailing block.
     """
-    if isinstance(query, str):
-        queries = [query]
-    else:
-        queries = list(query)
+    count = len(_pack(units, max_chars))
+    lo, hi = max(len(text) for _, text in units), max_chars
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if len(_pack(units, mid)) <= count:
+            hi = mid
+        else:
+            lo = mid + 1
+    return _pack(units, lo)
+
+def _join_units(block: list) -> str:
+    return "".join((sep if i else "") + text for i, (sep, text) in enumerate(block))
+
+def iter_text_blocks(source, max_chars: int = 2500, window: int = SPLIT_WINDOW):
+    """Yield TTS blocks of at most *max_chars* from *source*.
+
+    *source* is a string or an iterable of lines (e.g. an open file). Blocks
+    break at paragraphs; oversized paragraphs fall back to sentence, clause
+    and word boundaries. Only about ``window`` blocks of text are held at a
+    time and balanced against each other. With a window of one, a block is
+    filled greedily and emitted as soon as the next paragraph doesn't fit.
+    """
+    pack = _pack if window == 1 else _pack_balanced
+    buf, size = [], 0
+    for para in _paragraphs(source):
+        units = _split_long(para, max_chars)
+        units[0] = ("\n\n", units[0][1])
+        for unit in units:
+            buf.append(unit)
+            size += len(unit[0]) + len(unit[1])
+        if size >= window * max_chars:
+            blocks = pack(buf, max_chars)
+            for block in blocks[:-1]:
+                yield _join_units(block)
+            buf = blocks[-1]
+            size = sum(len(sep) + len(text) for sep, text in buf)
+    if buf:
+        for block in _pack_balanced(buf, max_chars):
+            yield _join_units(block)
+
+def split_text_blocks(text: str, max_chars: int = 2500,
+                      window: int = SPLIT_WINDOW) -> List[str]:
+    """ Teilt Text an Absatzgrenzen, damit ElevenLabs-Limits nicht reißen """
+    with METRICS.stage("split"):
+        return list(iter_text_blocks(text, max_chars, window))
+
+def _lines(pieces):
+    """Re-cut streamed text *pieces* into lines."""
+    rest = ""
+    for piece in pieces:
+        *lines, rest = (rest + piece).split("\n")
+        yield from lines
+    if rest:
+        yield rest
+
+def stream_script_blocks(topic: str, char_target: int, max_chars: int = 2500,
+                         client=None):
+    """Yield the TTS blocks of *topic*'s script while GPT is still writing it.
+
+    A block is emitted as soon as the following paragraphs push the buffer
+    past *max_chars* (:func:`iter_text_blocks` with a window of one), so its
+    TTS can start long before the answer is complete. The blocks are the
+    same as ``split_text_blocks(text, max_chars, window=1)`` of the full
+    text. A streamed script can't be generated again, so the length check is
+    reduced to this: once the blocks would exceed the tolerance of
+    *char_target*, the stream is closed and the rest is neither generated nor
+    synthesized. A short script is only reported.
+    """
+    hi = char_target * (1 + LENGTH_TOLERANCE)
+    pieces = stream_script(topic, char_target, client)
+    size = 0
+    try:
+        for block in iter_text_blocks(_lines(pieces), max_chars, window=1):
+            if size and size + len(block) > hi:
+                print(f"✂️ '{topic}': breche nach {size} von höchstens {int(hi)} "
+                      f"Zeichen ab")
+                return
+            size += len(block)
+            yield block
+    finally:
+        pieces.close()
+    if size < char_target * (1 - LENGTH_TOLERANCE):
+        print(f"⚠️ '{topic}': nur {size} von {char_target} Zeichen")
+
+_sessions = {}
+_session_lock = threading.Lock()
+_provider_slots = {name: threading.BoundedSemaphore(n) for name, n in IMAGE_WORKERS.items()}
+
+def http_session(provider: str) -> "requests.Session":
+    """Return the shared, connection-pooled session for *provider*."""
+    import requests
+    import requests.adapters
+
+    with _session_lock:
+        session = _sessions.get(provider)
+        if session is None:
+            session = requests.Session()
+            size = IMAGE_WORKERS.get(provider, max(4, TTS_WORKERS))
+            adapter = requests.adapters.HTTPAdapter(pool_connections=size, pool_maxsize=size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _sessions[provider] = session
+        return session
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+class CircuitBreaker:
+    """Stops calls to one host after repeated failures.
+
+    After ``threshold`` consecutive failures (connection errors, timeouts,
+    5xx) the breaker opens and :meth:`check` raises :class:`CircuitOpen` for
+    ``cooldown`` seconds. Then one call is let through as a probe: success
+    closes the breaker, another failure opens it again.
+    """
+
+    def __init__(self, host: str, threshold: int = BREAKER_FAILURES,
+                 cooldown: float = BREAKER_COOLDOWN):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened = None
+        self._lock = threading.Lock()
+
+    def check(self):
+        with self._lock:
+            if self.opened is None:
+                return
+            left = self.opened + self.cooldown - time.monotonic()
+            if left > 0:
+                raise CircuitOpen(f"{self.host} gesperrt nach {self.failures} Fehlern "
+                                  f"(noch {left:.0f}s)")
+            # probe: keep everyone else out for another cooldown
+            self.opened = time.monotonic()
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened = None
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened = time.monotonic()
+
+_breakers = {}
+
+def circuit_breaker(url: str) -> CircuitBreaker:
+    """Return the shared breaker for the host of *url*."""
+    from urllib.parse import urlsplit
+
+    host = urlsplit(url).netloc or url
+    with _session_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+def request(provider: str, method: str, url: str, retries: int = HTTP_RETRIES,
+            backoff: float = HTTP_BACKOFF, **kwargs) -> "requests.Response":
+    """Send a request over the pooled session of *provider*, riding out hiccups.
+
+    Connection errors, timeouts and :data:`RETRY_STATUSES` are retried up to
+    *retries* times with exponential backoff and jitter, honouring
+    ``Retry-After``. Every host has a :class:`CircuitBreaker`, so a host that
+    is down fails fast with :class:`CircuitOpen` instead of stalling each
+    caller through its full backoff. After the last attempt the response is
+    returned as is (callers still ``raise_for_status()``) or the error raised.
+    """
+    import requests
 
-    api = "https://commons.wikimedia.org/w/api.php"
-    headers = {"User-Agent": USER_AGENT}
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    breaker = circuit_breaker(url)
+    for attempt in range(retries + 1):
+        breaker.check()
+        try:
+            r = http_session(provider).request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            breaker.failure()
+            if attempt == retries:
+                raise
+            delay = _retry_delay(None, attempt, backoff)
+            reason = type(e).__name__
+        else:
+            if r.status_code not in RETRY_STATUSES:
+                breaker.success()
+                return r
+            if r.status_code >= 500:
+                breaker.failure()
+            if attempt == retries:
+                return r
+            delay = _retry_delay(r, attempt, backoff)
+            reason = f"HTTP {r.status_code}"
+            r.close()
+        METRICS.count(f"{provider}_retries")
+        print(f"⏳ {breaker.host}: {reason}, neuer Versuch in {delay:.1f}s …")
+        time.sleep(delay)
+
+def _fan_out(provider: str, fn: Callable, queries: List[str], limit: int) -> List[list]:
+    """Run ``fn(q, limit)`` for all *queries* in parallel, results in query order.
+
+    No more than ``IMAGE_WORKERS[provider]`` requests per provider run at once,
+    even across concurrent callers.
+    """
+    slots = _provider_slots[provider]
+
+    def job(q):
+        with slots:
+            return fn(q, limit)
 
+    if len(queries) <= 1:
+        return [job(q) for q in queries]
+    with ThreadPoolExecutor(max_workers=IMAGE_WORKERS[provider]) as pool:
+        return list(pool.map(job, queries))
+
+def _dedupe(result_lists, limit: int, seen: set | None = None) -> List[dict]:
+    """Flatten *result_lists* in order, dropping repeated URLs."""
+    seen = set() if seen is None else seen
     results: List[dict] = []
-    seen = set()
+    for items in result_lists:
+        for item in items:
+            if item["url"] in seen:
+                continue
+            seen.add(item["url"])
+            results.append(item)
+            if len(results) >= limit:
+                return results
+    return results
+
+class SearchCache:
+    """Persistent JSON cache for search API results.
+
+    Entries expire ``ttl`` seconds after they were stored. The file is read
+    on first use and rewritten (without expired entries) by :meth:`save`.
+    """
+
+    def __init__(self, path: Path, ttl: int):
+        self.path = path
+        self.ttl = ttl
+        self._data = None
+        self._lock = threading.Lock()
+
+    def _entries(self) -> dict:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._data = {}
+        return self._data
+
+    def get(self, key: str):
+        """Return the cached value for *key*, or ``None`` if missing or expired."""
+        with self._lock:
+            entry = self._entries().get(key)
+        if entry and time.time() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._entries()[key] = [time.time(), value]
+
+    def save(self):
+        with self._lock:
+            now = time.time()
+            data = {k: v for k, v in self._entries().items() if now - v[0] < self.ttl}
+            self._data = data
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+SEARCH_CACHE = SearchCache(SEARCH_CACHE_FILE, SEARCH_CACHE_TTL)
+
+def _count_response(provider: str, r):
+    METRICS.count(f"{provider}_requests")
+    METRICS.count(f"{provider}_bytes", len(r.content))
+
+def _wikimedia_titles(q: str, limit: int) -> List[str]:
+    """File titles matching *q*, best match first (cached)."""
+    key = f"wikimedia:search:{limit}:{q}"
+    titles = SEARCH_CACHE.get(key)
+    if titles is not None:
+        METRICS.count("search_cache_hits")
+        return titles
+    import requests
+
+    params = {
+        "action": "query",
+        "format": "json",
+        "list": "search",
+        "srsearch": q,
+        "srlimit": limit,
+        "srnamespace": 6,
+        "srprop": "",
+    }
+    try:
+        r = request("wikimedia", "GET", WIKIMEDIA_API, params=params, timeout=15)
+        r.raise_for_status()
+    except (requests.RequestException, CircuitOpen) as e:
+        print(f"❌ Wikimedia request failed for '{q}': {e}")
+        return []
+    _count_response("wikimedia", r)
+    titles = [hit["title"] for hit in r.json().get("query", {}).get("search", [])]
+    SEARCH_CACHE.put(key, titles)
+    return titles
+
+def _wikimedia_imageinfo(titles: List[str]) -> dict:
+    """Resolve URL and license of many *titles* in few batched requests.
+
+    Only the ``LicenseShortName`` metadata field is requested, plus a preview
+    URL scaled to :data:`THUMB_WIDTH`. Titles without
+    an image are cached as empty entries so they are not asked for again.
+    """
+    infos, missing = {}, []
+    for title in dict.fromkeys(titles):
+        cached = SEARCH_CACHE.get(f"wikimedia:info:{title}")
+        if cached is None:
+            missing.append(title)
+        else:
+            METRICS.count("search_cache_hits")
+            infos[title] = cached
+
+    batches = [missing[i:i + WIKIMEDIA_BATCH] for i in range(0, len(missing), WIKIMEDIA_BATCH)]
+
+    def fetch(batch, _limit):
+        import requests
 
-    for q in queries:
-        if len(results) >= limit:
-            break
         params = {
             "action": "query",
             "format": "json",
-            "generator": "search",
-            "gsrsearch": q,
-            "gsrlimit": limit - len(results),
-            "gsrnamespace": 6,
+            "titles": "|".join(batch),
             "prop": "imageinfo",
             "iiprop": "url|extmetadata",
+            "iiextmetadatafilter": "LicenseShortName",
+            "iiurlwidth": THUMB_WIDTH,
         }
-
         try:
-            r = requests.get(api, params=params, headers=headers, timeout=15)
+            r = request("wikimedia", "GET", WIKIMEDIA_API, params=params, timeout=15)
             r.raise_for_status()
-        except requests.RequestException as e:
-            print(f"❌ Wikimedia request failed for '{q}': {e}")
-            continue
-        data = r.json()
-
-        for page in data.get("query", {}).get("pages", {}).values():
+        except (requests.RequestException, CircuitOpen) as e:
+            print(f"❌ Wikimedia imageinfo request failed: {e}")
+            return None
+        _count_response("wikimedia", r)
+        found = {title: {} for title in batch}
+        for page in r.json().get("query", {}).get("pages", {}).values():
             info = page.get("imageinfo", [{}])[0]
-            url = info.get("url")
-            if not url or url in seen:
+            if not info.get("url"):
                 continue
-            seen.add(url)
             license = (
                 info.get("extmetadata", {})
                 .get("LicenseShortName", {})
                 .get("value")
             )
-            results.append({
-                "title": page.get("title"),
-                "url": url,
+            found[page.get("title")] = {
+                "url": info["url"],
+                "thumb": info.get("thumburl") or info["url"],
                 "license": license,
-            })
-            if len(results) >= limit:
-                break
+            }
+        return found
 
+    for found in _fan_out("wikimedia", fetch, batches, 0):
+        if found is None:
+            continue
+        for title, info in found.items():
+            SEARCH_CACHE.put(f"wikimedia:info:{title}", info)
+            infos[title] = info
+    return infos
+
+def _wikimedia_results(queries: List[str], limit: int) -> List[List[dict]]:
+    """Image results per query: parallel searches, then batched imageinfo."""
+    title_lists = _fan_out("wikimedia", _wikimedia_titles, queries, limit)
+    infos = _wikimedia_imageinfo([t for titles in title_lists for t in titles])
+    SEARCH_CACHE.save()
+
+    results = []
+    for titles in title_lists:
+        items = []
+        for title in titles:
+            info = infos.get(title)
+            if info:
+                items.append({
+                    "title": title,
+                    "url": info["url"],
+                    "thumb": info.get("thumb") or info["url"],
+                    "license": info["license"],
+                })
+        results.append(items)
     return results
 
+def search_wikimedia_images(query, limit: int = 3) -> List[dict]:
+    """Search Wikimedia Commons for freely licensed images.
+
+    ``query`` may be a single string or a list of strings. All queries are
+    sent in parallel, the found files are resolved with batched imageinfo
+    requests, and the results are combined in query order until ``limit``
+    unique images are collected. Searches and file infos are cached on disk
+    for :data:`SEARCH_CACHE_TTL` seconds. A list of dictionaries with
+    ``title``, ``url``, ``thumb`` (scaled preview) and ``license`` is
+    returned.
+    """
+    if isinstance(query, str):
+        queries = [query]
+    else:
+        queries = list(query)
+    with METRICS.stage("images"):
+        return _dedupe(_wikimedia_results(queries, limit), limit)
+
+
+def _unsplash_query(q: str, limit: int) -> List[dict]:
+    key = f"unsplash:{limit}:{q}"
+    cached = SEARCH_CACHE.get(key)
+    if cached is not None:
+        METRICS.count("search_cache_hits")
+        return cached
+    import requests
+
+    access_key = os.getenv("UNSPLASH_ACCESS_KEY")
+    headers = {"Authorization": f"Client-ID {access_key}"}
+    params = {"query": q, "per_page": limit}
+    try:
+        r = request("unsplash", "GET", UNSPLASH_API, params=params,
+                    headers=headers, timeout=15)
+        r.raise_for_status()
+    except (requests.RequestException, CircuitOpen) as e:
+        print(f"❌ Unsplash request failed for '{q}': {e}")
+        return []
+    _count_response("unsplash", r)
+    data = r.json()
+
+    results = []
+    for item in data.get("results", []):
+        url = item.get("urls", {}).get("regular")
+        if not url:
+            continue
+        results.append({
+            "title": item.get("description") or item.get("alt_description"),
+            "url": url,
+            "thumb": item.get("urls", {}).get("small") or url,
+            "license": "Unsplash License",
+        })
+    SEARCH_CACHE.put(key, results)
+    return results
 
 def search_unsplash_images(query, limit: int = 3) -> List[dict]:
     """Search Unsplash for images if an access key is provided.
@@ -166,46 +1117,17 @@ def search_unsplash_images(query, limit: int = 3) -> List[dict]:
     dictionaries with ``title``, ``url`` and ``license`` is returned. If no
     key is available or a request fails, an empty list is returned.
     """
-    access_key = os.getenv("UNSPLASH_ACCESS_KEY")
-    if not access_key:
+    if not os.getenv("UNSPLASH_ACCESS_KEY"):
         return []
 
     if isinstance(query, str):
         queries = [query]
     else:
         queries = list(query)
-
-    headers = {"User-Agent": USER_AGENT, "Authorization": f"Client-ID {access_key}"}
-    api = "https://api.unsplash.com/search/photos"
-
-    results: List[dict] = []
-    seen = set()
-
-    for q in queries:
-        if len(results) >= limit:
-            break
-        params = {"query": q, "per_page": limit - len(results)}
-        try:
-            r = requests.get(api, params=params, headers=headers, timeout=15)
-            r.raise_for_status()
-        except requests.RequestException as e:
-            print(f"❌ Unsplash request failed for '{q}': {e}")
-            continue
-        data = r.json()
-        for item in data.get("results", []):
-            url = item.get("urls", {}).get("regular")
-            if not url or url in seen:
-                continue
-            seen.add(url)
-            results.append({
-                "title": item.get("description") or item.get("alt_description"),
-                "url": url,
-                "license": "Unsplash License",
-            })
-            if len(results) >= limit:
-                break
-
-    return results
+    with METRICS.stage("images"):
+        results = _fan_out("unsplash", _unsplash_query, queries, limit)
+        SEARCH_CACHE.save()
+    return _dedupe(results, limit)
 
 
 def extract_image_queries(text: str) -> List[str]:
@@ -221,59 +1143,1586 @@ def extract_image_queries(text: str) -> List[str]:
 def search_images_for_script(text: str, per_query: int = 1) -> List[dict]:
     """Gather images for each paragraph of ``text``.
 
-    For every paragraph in the script one search query is created. Results
-    from Wikimedia Commons are combined with images from Unsplash if an access
-    key is configured. The total number of returned images is roughly
-    ``per_query`` times the number of paragraphs.
+    For every paragraph in the script one search query is created. All
+    paragraphs are searched on Wikimedia Commons in parallel; paragraphs that
+    came up short are then searched on Unsplash if an access key is
+    configured. The total number of returned images is roughly ``per_query``
+    times the number of paragraphs.
     """
     queries = extract_image_queries(text)
+    with METRICS.stage("images"):
+        wiki = _wikimedia_results(queries, per_query)
+
+        extra = [[] for _ in queries]
+        if os.getenv("UNSPLASH_ACCESS_KEY"):
+            short = [i for i, found in enumerate(wiki) if len(found) < per_query]
+            found = _fan_out("unsplash", _unsplash_query, [queries[i] for i in short],
+                             per_query)
+            for i, items in zip(short, found):
+                extra[i] = items
+            SEARCH_CACHE.save()
+
+    seen = set()
     images: List[dict] = []
-    for q in queries:
-        images.extend(search_wikimedia_images(q, limit=per_query))
-        if len(images) < per_query * len(queries):
-            images.extend(search_unsplash_images(q, limit=per_query))
+    for w, u in zip(wiki, extra):
+        images.extend(_dedupe([w, u], per_query, seen))
     return images[: per_query * len(queries)]
 
-def tts_chunk(text: str, idx: int, basename: str) -> Path:
-    """ Ein Block Text -> MP3 via ElevenLabs """
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}/stream"
+class TTSCache:
+    """Content-addressed store of rendered TTS chunks.
+
+    Entries are keyed by a hash of everything that influences the audio
+    (text, voice, model and voice settings), so unchanged blocks are reused
+    no matter where they appear in a script. The modification time of a file
+    serves as its LRU timestamp; :meth:`prune` removes the least recently
+    used entries once the cache grows beyond ``max_bytes``.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, voice_id: str, model_id: str, voice_settings: dict) -> str:
+        raw = json.dumps(
+            {"text": text, "voice": voice_id, "model": model_id, "settings": voice_settings},
+            sort_keys=True, ensure_ascii=False,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path(self, key: str, ext: str = ".mp3") -> Path:
+        return self.directory / f"{key}{ext}"
+
+    def _files(self) -> list:
+        return [f for f in self.directory.glob("*") if f.suffix in (".mp3", ".wav")]
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """Copy the entry for *key* to *dest*; return ``False`` on a miss."""
+        src = self.path(key, dest.suffix)
+        try:
+            shutil.copyfile(src, dest)
+            os.utime(src)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, src: Path):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        dest = self.path(key, src.suffix)
+        tmp = dest.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+
+    def size(self) -> int:
+        return sum(f.stat().st_size for f in self._files())
+
+    def prune(self, max_bytes: int | None = None) -> int:
+        """Evict least recently used entries; return the number removed."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(
+            (f.stat().st_mtime, f.stat().st_size, f)
+            for f in self._files()
+        )
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, f in entries:
+            if total <= limit:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> str:
+        return f"{self.hits} Treffer, {self.misses} neu synthetisiert"
+
+TTS_CACHE = TTSCache(CACHE_DIR, TTS_CACHE_MB * 1024 * 1024)
+
+_FICLONE = 0x40049409  # Linux ioctl: share the extents of another file
+
+def _reflink(src: Path, dest: Path):
+    """Clone *src* to *dest* copy-on-write (btrfs, XFS); ``OSError`` if unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("reflink not supported") from None
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            dest.unlink(missing_ok=True)
+            raise
+    shutil.copystat(src, dest)
+
+def clone_file(src: Path, dest: Path) -> str:
+    """Put a copy of *src* at *dest*, sharing its bytes if the filesystem allows.
+
+    A reflink (copy-on-write clone) is tried first, then a plain copy; either
+    way *dest* is a file of its own that can be edited without touching
+    *src*. *dest* is replaced atomically. Returns ``"reflink"`` or ``"copy"``.
+    """
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        _reflink(src, tmp)
+        method = "reflink"
+    except OSError:
+        shutil.copy2(src, tmp)
+        method = "copy"
+    os.replace(tmp, dest)
+    return method
+
+class AssetStore:
+    """Content-addressed store for project assets such as images.
+
+    On a filesystem with reflinks (btrfs, XFS) every distinct file is kept
+    once as ``<sha256><ext>`` in *directory*, and :func:`stage_assets` clones
+    project copies from these blobs, so an image used by many topics and
+    projects takes its space only once. Without reflinks a blob would just be
+    one more copy, so none is kept and projects are copied from the source.
+    Sources and copies stay independent files either way; ``index.json``
+    remembers which staged file came from which blob.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.index_path = directory / "index.json"
+        self._lock = threading.Lock()
+        self._index = None
+        # learned from the first clone: None until then
+        self.reflinks = None
+
+    @staticmethod
+    def digest(path: Path) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _load(self) -> dict:
+        if self._index is None:
+            try:
+                self._index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._index = {}
+        return self._index
+
+    def add(self, src: Path) -> Path | None:
+        """Store the content of *src* and return its blob; *src* is not changed.
+
+        Returns ``None`` if the filesystem can't reflink; the file is not stored.
+        """
+        if self.reflinks is False:
+            return None
+        blob = self.directory / f"{self.digest(src)}{src.suffix.lower()}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not blob.exists():
+            tmp = blob.with_name(f".{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                _reflink(src, tmp)
+            except OSError:
+                self.reflinks = False
+                return None
+            os.replace(tmp, blob)
+            self.reflinks = True
+        return blob
+
+    def staged(self, dest: Path, blob: Path):
+        """Remember that *dest* is a copy of *blob*."""
+        with self._lock:
+            self._load()[str(dest.resolve())] = blob.name
+            tmp = self.index_path.with_name(f"index.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self._index, indent=1), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+
+    def prune(self) -> int:
+        """Remove blobs whose staged copies are all gone; return how many.
+
+        Copies never depend on their blob, so this only gives up sharing.
+        """
+        with self._lock:
+            index = self._load()
+            for dest in [d for d in index if not Path(d).exists()]:
+                del index[dest]
+            used = set(index.values())
+            removed = 0
+            for blob in self.directory.glob("*"):
+                if blob != self.index_path and blob.is_file() and blob.name not in used:
+                    blob.unlink(missing_ok=True)
+                    removed += 1
+            if self.directory.exists():
+                self.index_path.write_text(json.dumps(index, indent=1), encoding="utf-8")
+        return removed
+
+ASSETS = AssetStore(ASSETS_DIR)
+
+def _up_to_date(src: Path, dest: Path) -> bool:
+    try:
+        a, b = src.stat(), dest.stat()
+    except FileNotFoundError:
+        return False
+    return a.st_size == b.st_size and a.st_mtime_ns == b.st_mtime_ns
+
+def stage_assets(src_dir: Path, dest_dir: Path, store: AssetStore | None = None) -> dict:
+    """Sync the files of *src_dir* into *dest_dir*.
+
+    Files that are already there (same size and mtime, or same content) are
+    skipped. New or changed files are added to *store* and reflinked from
+    their blob, so they share its bytes; where the filesystem has no reflinks
+    they are plain copies of the source. A project copy can be edited without
+    affecting anything else. Files that vanished from *src_dir* are left
+    alone. Returns the number of files per outcome.
+    """
+    store = store or ASSETS
+    counts = {"reflink": 0, "copy": 0, "skipped": 0}
+    for src in sorted(p for p in src_dir.rglob("*")
+                      if p.is_file() and not p.name.endswith(".part")):
+        dest = dest_dir / src.relative_to(src_dir)
+        if _up_to_date(src, dest):
+            counts["skipped"] += 1
+            continue
+        blob = store.add(src)
+        if dest.exists() and dest.stat().st_size == src.stat().st_size and \
+                store.digest(dest) == (blob.stem if blob else store.digest(src)):
+            counts["skipped"] += 1
+        else:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            counts[clone_file(blob or src, dest)] += 1
+            shutil.copystat(src, dest)
+        if blob:
+            store.staged(dest, blob)
+    for method, n in counts.items():
+        METRICS.count(f"assets_{method}", n)
+    return counts
+
+# MPEG audio Layer III: bit rates (kbit/s) and sample rates by version bits
+_MP3_BITRATES = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+def _mp3_seconds(data: bytes) -> float | None:
+    """Sum the frame durations of an MP3 (Layer III) without decoding it."""
+    pos = 0
+    if data.startswith(b"ID3") and len(data) >= 10:
+        size = 0
+        for b in data[6:10]:
+            size = (size << 7) | (b & 0x7F)
+        pos = 10 + size + (10 if data[5] & 0x10 else 0)
+    seconds, frames = 0.0, 0
+    while pos + 4 <= len(data):
+        b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+        version, layer = (b1 >> 3) & 3, (b1 >> 1) & 3
+        br_idx, sr_idx = b2 >> 4, (b2 >> 2) & 3
+        if (data[pos] != 0xFF or (b1 & 0xE0) != 0xE0 or version == 1 or layer != 1
+                or br_idx in (0, 15) or sr_idx == 3):
+            if frames:
+                break  # trailing tag or garbage
+            pos += 1
+            continue
+        rate = _MP3_RATES[version][sr_idx]
+        bitrate = _MP3_BITRATES[3 if version == 3 else 2][br_idx] * 1000
+        samples = 1152 if version == 3 else 576
+        length = samples // 8 * bitrate // rate + ((b2 >> 1) & 1)
+        if not frames:
+            # a leading Xing/Info frame (LAME) holds the encoder's header, no audio
+            mono = b3 >> 6 == 3
+            side = (17 if mono else 32) if version == 3 else (9 if mono else 17)
+            if data[pos + 4 + side:pos + 8 + side] in (b"Xing", b"Info"):
+                pos += length
+                continue
+        seconds += samples / rate
+        frames += 1
+        pos += length
+    return seconds if frames else None
+
+def audio_duration(path: Path) -> float | None:
+    """Length of a WAV or MP3 file in seconds, read from its headers."""
+    path = Path(path)
+    try:
+        if path.suffix == ".wav":
+            with wave.open(str(path)) as w:
+                return w.getnframes() / w.getframerate()
+        if path.suffix == ".mp3":
+            return _mp3_seconds(path.read_bytes())
+    except (OSError, EOFError, wave.Error):
+        pass
+    return None
+
+def voice_key(backend: str | None = None) -> str:
+    """Identify everything that changes the speaking rate of *backend*."""
+    backend = backend or TTS_BACKEND
+    if backend == "elevenlabs":
+        settings = json.dumps(VOICE_SETTINGS, sort_keys=True)
+        return f"elevenlabs/{VOICE_ID}/{TTS_MODEL}/{_text_hash(settings)[:8]}"
+    if backend == "command":
+        return f"command/{_text_hash(TTS_COMMAND)[:8]}"
+    return backend
+
+class Calibration:
+    """Measured speaking rate per voice, stored as JSON.
+
+    :func:`tts_chunk` adds the characters and the audio length of every
+    freshly rendered part under its :func:`voice_key`. Once an entry holds
+    more than ``window`` seconds both sums are scaled down, so the rate
+    follows changes in a voice's delivery instead of averaging forever.
+    """
+
+    def __init__(self, path: Path, window: float = CALIBRATION_WINDOW,
+                 min_seconds: float = CALIBRATION_MIN_SECONDS):
+        self.path = path
+        self.window = window
+        self.min_seconds = min_seconds
+        self._data = None
+        self._lock = threading.Lock()
+
+    def _entries(self) -> dict:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._data = {}
+        return self._data
+
+    def record(self, key: str, chars: int, seconds: float):
+        with self._lock:
+            entry = self._entries().setdefault(key, {"chars": 0, "seconds": 0.0})
+            entry["chars"] += chars
+            entry["seconds"] += seconds
+            if entry["seconds"] > self.window:
+                scale = self.window / entry["seconds"]
+                entry["chars"] *= scale
+                entry["seconds"] *= scale
+
+    def chars_per_min(self, key: str, default: float = CHARS_PER_MIN) -> float:
+        """Measured rate for *key*, or *default* while too little is known."""
+        with self._lock:
+            entry = self._entries().get(key)
+        if not entry or entry["seconds"] < self.min_seconds:
+            return default
+        return entry["chars"] / entry["seconds"] * 60
+
+    def save(self):
+        with self._lock:
+            if self._data is None:
+                return
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(self._data, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+CALIBRATION = Calibration(CALIBRATION_FILE)
+
+def _retry_delay(r, attempt: int, backoff: float) -> float:
+    """Wartezeit vor dem nächsten Versuch: ``Retry-After`` oder exponentiell.
+
+    The exponential delay is jittered between half and the full value, so
+    workers that failed together don't retry in lockstep.
+    """
+    retry_after = r.headers.get("Retry-After") if r is not None else None
+    if retry_after:
+        try:
+            return min(HTTP_MAX_DELAY, max(0.0, float(retry_after)))
+        except ValueError:
+            from email.utils import parsedate_to_datetime
+            try:
+                when = parsedate_to_datetime(retry_after).timestamp()
+                return min(HTTP_MAX_DELAY, max(0.0, when - time.time()))
+            except (TypeError, ValueError):
+                pass
+    return min(HTTP_MAX_DELAY, backoff * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+def _looks_like_mp3(head: bytes) -> bool:
+    """True if *head* starts with an ID3 tag or an MPEG frame sync."""
+    if head.startswith(b"ID3"):
+        return True
+    return len(head) >= 2 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0
+
+def _stream_to_file(r, dest: Path, started: float) -> tuple[float, int]:
+    """Write the body of streamed response *r* to *dest* as it arrives.
+
+    Returns time-to-first-byte (relative to *started*) and the byte count.
+    """
+    ttfb = None
+    size = 0
+    with open(dest, "wb") as f:
+        for chunk in r.iter_content(chunk_size=STREAM_CHUNK):
+            if not chunk:
+                continue
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+            f.write(chunk)
+            size += len(chunk)
+    return (ttfb or 0.0), size
+
+def _synth_elevenlabs(text: str, dest: Path, idx: int, retries: int, backoff: float):
+    """Stream the ElevenLabs rendering of *text* to *dest*."""
+    import requests
+
+    if not ELEVEN_KEY:
+        raise ConfigError("ELEVEN_API_KEY fehlt in .env")
+    url = f"{ELEVEN_API}/v1/text-to-speech/{VOICE_ID}/stream"
     headers = {"xi-api-key": ELEVEN_KEY, "Content-Type": "application/json"}
     payload = {
         "text": text,
-        "model_id": "eleven_multilingual_v2",
-        "voice_settings": {"stability": 0.45, "similarity_boost": 0.8, "speed": 1.0}
+        "model_id": TTS_MODEL,
+        "voice_settings": VOICE_SETTINGS,
     }
+    tmp = dest.with_name(dest.name + ".part")
+    # a stream that breaks off is requested again; the text is the same, so
+    # the repeat is harmless. Connection errors before the response are
+    # already retried by request().
+    for attempt in range(retries + 1):
+        r = None
+        try:
+            started = time.perf_counter()
+            r = request("elevenlabs", "POST", url, retries=retries, backoff=backoff,
+                        headers=headers, json=payload, timeout=180, stream=True)
+            r.raise_for_status()
+            ttfb, size = _stream_to_file(r, tmp, started)
+            break
+        except requests.exceptions.ChunkedEncodingError as e:
+            tmp.unlink(missing_ok=True)
+            if attempt == retries:
+                raise
+            METRICS.count("elevenlabs_retries")
+            print(f"⏳ Chunk {idx}: Übertragung abgebrochen ({e}), neuer Versuch …")
+            time.sleep(_retry_delay(None, attempt, backoff))
+        except requests.RequestException as e:
+            tmp.unlink(missing_ok=True)
+            print("❌ ElevenLabs Fehlerantwort:")
+            # only an error status still has its body; a stream that was
+            # partly read can't be read again
+            if isinstance(e, requests.HTTPError) and r is not None:
+                print(r.text[:500])
+            print(e)
+            raise
+
+    with open(tmp, "rb") as f:
+        head = f.read(4)
+    if size < TTS_MIN_BYTES or not _looks_like_mp3(head):
+        tmp.unlink(missing_ok=True)
+        raise ValueError(f"Ungültige MP3-Antwort für Chunk {idx} ({size} Bytes)")
+    os.replace(tmp, dest)
+
+    elapsed = time.perf_counter() - started
+    rate = size / elapsed if elapsed > 0 else 0.0
+    print(f"⬇️ Chunk {idx}: {size / 1024:.0f} KB, TTFB {ttfb:.2f}s, "
+          f"{rate / 1024:.0f} KB/s")
+
+def _synth_command(text: str, dest: Path, idx: int, retries: int, backoff: float):
+    """Render *text* with the offline engine in :data:`TTS_COMMAND`.
+
+    The text is passed on stdin. If the command contains ``{out}`` the engine
+    writes the WAV file itself (piper), otherwise WAV is read from stdout
+    (``espeak-ng --stdout``).
+    """
+    tmp = dest.with_name(dest.name + ".part")
+    cmd = [arg.replace("{out}", str(tmp)) for arg in shlex.split(TTS_COMMAND)]
+    proc = subprocess.run(cmd, input=text.encode("utf-8"), capture_output=True)
+    if proc.returncode != 0:
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(f"TTS-Befehl fehlgeschlagen für Chunk {idx}: "
+                           f"{proc.stderr.decode(errors='replace')[:500]}")
+    if "{out}" not in TTS_COMMAND:
+        tmp.write_bytes(proc.stdout)
+    os.replace(tmp, dest)
+
+def _synth_fake(text: str, dest: Path, idx: int, retries: int, backoff: float):
+    """Write silence as long as *text* would take to speak at CHARS_PER_MIN."""
+    frames = len(text) * FAKE_RATE * 60 // CHARS_PER_MIN
+    with wave.open(str(dest), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(FAKE_RATE)
+        w.writeframes(b"\0\0" * frames)
+
+# backend name -> (synth function, file extension)
+_SYNTHS = {
+    "elevenlabs": (_synth_elevenlabs, ".mp3"),
+    "command": (_synth_command, ".wav"),
+    "fake": (_synth_fake, ".wav"),
+}
+
+# striped: identical blocks always share a lock, and the number of locks
+# stays fixed however many blocks a long-running process renders
+_block_locks = [threading.Lock() for _ in range(64)]
+
+def _block_lock(key: str) -> threading.Lock:
+    return _block_locks[hash(key) % len(_block_locks)]
+
+def tts_cache_key(text: str, backend: str | None = None) -> str:
+    backend = backend or TTS_BACKEND
+    if backend == "elevenlabs":
+        return TTSCache.key(text, VOICE_ID, TTS_MODEL, VOICE_SETTINGS)
+    return TTSCache.key(text, backend, TTS_COMMAND, {})
+
+def is_cached(text: str, backend: str | None = None) -> bool:
+    """Whether :func:`tts_chunk` would take *text* from the cache."""
+    backend = backend or TTS_BACKEND
+    return backend != "fake" and TTS_CACHE.path(
+        tts_cache_key(text, backend), _SYNTHS[backend][1]).exists()
+
+def tts_chunk(text: str, idx: int, basename: str,
+              retries: int = TTS_RETRIES, backoff: float = TTS_BACKOFF,
+              use_cache: bool = True, backend: str | None = None) -> Path:
+    """ Ein Block Text -> Audio via :data:`TTS_BACKEND` (Standard ElevenLabs) """
+    backend = backend or TTS_BACKEND
+    synth, ext = _SYNTHS[backend]
+    fn = PARTS_DIR / f"{basename}_{idx:02d}{ext}"
+    key = tts_cache_key(text, backend)
+    use_cache = use_cache and backend != "fake"
+
+    def render():
+        cost = tts_cost(len(text), backend)
+        with USAGE.held(len(text), cost):
+            with METRICS.stage("tts"):
+                synth(text, fn, idx, retries, backoff)
+            USAGE.record("tts", basename, chars=len(text), cost=cost)
+        seconds = audio_duration(fn)
+        if seconds:
+            CALIBRATION.record(voice_key(backend), len(text), seconds)
+        METRICS.count("tts_requests")
+        METRICS.count("tts_chars", len(text))
+        METRICS.count("tts_bytes", fn.stat().st_size)
+
+    if not use_cache:
+        render()
+        return fn
+    # identical blocks are rendered (and paid for) once, however many
+    # workers ask for them at the same time
+    with _block_lock(key):
+        if TTS_CACHE.fetch(key, fn):
+            METRICS.count("tts_cache_hits")
+            USAGE.record("tts", basename, chars=len(text), cached=True,
+                         saved=tts_cost(len(text), backend))
+            return fn
+        render()
+        METRICS.count("tts_cache_misses")
+        TTS_CACHE.store(key, fn)
+    return fn
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class Manifest:
+    """Persistent state of a project run, stored as ``manifest.json``.
+
+    For every topic it records the script file and its hash, and for every
+    block its text hash, status (``done`` or ``failed``) and output file.
+    With ``--resume`` finished scripts and blocks are taken from here instead
+    of being generated and paid for again. Each update is written atomically.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = {"topics": {}}
+        if resume and path.exists():
+            self.data = json.loads(path.read_text(encoding="utf-8"))
+        self.save()
+
+    def save(self):
+        with self._lock:
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(self.data, indent=2, ensure_ascii=False),
+                           encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def _entry(self, key: str) -> dict:
+        return self.data["topics"].setdefault(key, {"blocks": {}})
+
+    def script(self, key: str, topic: str) -> Path | None:
+        """Return the saved script for *key* if it belongs to *topic*."""
+        entry = self.data["topics"].get(key, {})
+        path = entry.get("script")
+        if entry.get("topic") == topic and path and Path(path).exists():
+            return Path(path)
+        return None
+
+    def set_script(self, key: str, topic: str, path: Path, text: str):
+        with self._lock:
+            entry = self._entry(key)
+            entry.update(topic=topic, script=str(path), script_hash=_text_hash(text))
+        self.save()
+
+    def block(self, key: str, i: int, text: str) -> Path | None:
+        """Return the rendered file of block *i* if it is done and unchanged."""
+        block = self.data["topics"].get(key, {}).get("blocks", {}).get(str(i), {})
+        path = block.get("path")
+        if (block.get("status") == "done" and block.get("hash") == _text_hash(text)
+                and path and Path(path).exists()):
+            return Path(path)
+        return None
+
+    def set_block(self, key: str, i: int, text: str, status: str,
+                  path: Path | None = None, error: str | None = None):
+        with self._lock:
+            self._entry(key)["blocks"][str(i)] = {
+                "hash": _text_hash(text),
+                "status": status,
+                "path": str(path) if path else None,
+                "error": error,
+            }
+        self.save()
+
+def _render_block(tts: Callable, text: str, i: int, label: str, basename: str,
+                  start: int, use_cache: bool, manifest: Manifest | None,
+                  key: str | None) -> Path:
+    """Render block *i* with *tts*, reusing and recording it in *manifest*."""
+    if manifest is not None:
+        done = manifest.block(key, i, text)
+        if done:
+            return done
+    print(f"TTS {basename} {label} …")
     try:
-        r = requests.post(url, headers=headers, json=payload, timeout=180)
-        r.raise_for_status()
-    except requests.RequestException as e:
-        print("❌ ElevenLabs Fehlerantwort:")
-        if 'r' in locals():
-            print(r.text[:500])
-        print(e)
+        path = tts(text, start + i, basename, use_cache=use_cache)
+    except Exception as e:
+        if manifest is not None:
+            manifest.set_block(key, i, text, "failed", error=str(e))
         raise
+    if manifest is not None:
+        manifest.set_block(key, i, text, "done", path)
+    return path
 
-    fn = PARTS_DIR / f"{basename}_{idx:02d}.mp3"
-    with open(fn, "wb") as f:
-        f.write(r.content)
-    return fn
+def _submit_blocks(pool, blocks: List[str], basename: str, start: int = 0,
+                   use_cache: bool = True, tts: Callable | None = None,
+                   manifest: Manifest | None = None, key: str | None = None) -> list:
+    """Queue *blocks* on *pool* and return the futures in block order.
+
+    With a *manifest*, blocks already finished under *key* are skipped and
+    every block's outcome is recorded.
+    """
+    tts = tts or tts_chunk
+    total = len(blocks)
+    return [pool.submit(_render_block, tts, block, i, f"{i+1}/{total}", basename,
+                        start, use_cache, manifest, key)
+            for i, block in enumerate(blocks)]
+
+def tts_blocks(blocks: List[str], basename: str, start: int = 0,
+               workers: int = TTS_WORKERS, use_cache: bool = True,
+               manifest: Manifest | None = None, key: str | None = None,
+               progress: Callable | None = None) -> List[Path]:
+    """Synthesize *blocks* concurrently and return the files in block order.
+
+    At most ``workers`` requests are in flight at once. Block ``i`` is written
+    as ``{basename}_{start + i}``, so the result can go straight into
+    :func:`merge_parts`. Blocks already rendered with the same voice settings
+    are taken from :data:`TTS_CACHE` unless ``use_cache`` is false.
+    ``progress(done, total)`` is called from the worker threads after each
+    finished block.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = _submit_blocks(pool, blocks, basename, start, use_cache,
+                                 manifest=manifest, key=key or basename)
+        if progress is not None:
+            done = itertools.count(1)
+            for f in futures:
+                f.add_done_callback(lambda _f: progress(next(done), len(futures)))
+        return [f.result() for f in futures]
+
+def run_topics(topics: List[str], basename: str, project_dir: Path, char_target: int,
+               max_chunk: int = 2500, gpt_workers: int = GPT_WORKERS,
+               workers: int = TTS_WORKERS, use_cache: bool = True,
+               client=None, tts: Callable | None = None,
+               manifest: Manifest | None = None,
+               stream: bool = False, blocks: list | None = None) -> List[List[Path]]:
+    """Generate and synthesize all *topics* as a pipeline.
+
+    Up to ``gpt_workers`` scripts are generated at once. As soon as a script
+    arrives it is saved to *project_dir* and its blocks are queued for TTS on
+    a shared pool of ``workers`` threads, independent of the other topics.
+    The part files are returned per topic, in the order of *topics*.
+    ``client`` and ``tts`` replace the OpenAI client and :func:`tts_chunk`.
+    Scripts and blocks recorded as finished in *manifest* are reused.
+
+    A failed script or block doesn't stop the other topics: everything else
+    is finished (and recorded in *manifest*) before the first error is
+    raised, so a ``--resume`` only has to redo what actually failed.
+
+    With *stream*, scripts are streamed from GPT and every block goes to TTS
+    as soon as it is complete (see :func:`stream_script_blocks`); all scripts
+    are then split with a window of one, so resumed runs get the same blocks.
+
+    If *blocks* is given, the texts of every topic's blocks are appended to
+    it, in the same shape as the returned files (e.g. for
+    :func:`write_chapter_index`).
+    """
+    window = 1 if stream else SPLIT_WINDOW
+    gpt_pool = ThreadPoolExecutor(max_workers=max(1, gpt_workers))
+    tts_pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    def stream_topic(n: int, topic: str):
+        started = time.perf_counter()
+        basename_n = f"{basename}_{n:02d}"
+        blocks, futures = [], []
+        try:
+            for block in stream_script_blocks(topic, char_target, max_chunk, client):
+                if not blocks:
+                    print(f"⚡ Erster Block von '{topic}' nach "
+                          f"{time.perf_counter() - started:.1f}s")
+                futures.append(tts_pool.submit(
+                    _render_block, tts or tts_chunk, block, len(blocks),
+                    str(len(blocks) + 1), basename_n, 0, use_cache, manifest, str(n),
+                ))
+                blocks.append(block)
+        except BaseException:
+            # the script is lost, so don't pay for the blocks still queued
+            for f in futures:
+                f.cancel()
+            raise
+        return blocks, futures
+
+    try:
+        scripts = {}
+        for n, topic in enumerate(topics, 1):
+            done = manifest.script(str(n), topic) if manifest else None
+            if done:
+                print(f"♻️ Skript vorhanden: {topic}")
+                fut = gpt_pool.submit(done.read_text, encoding="utf-8")
+            elif stream:
+                print(f"📝 Streame Skript: {topic}")
+                fut = gpt_pool.submit(stream_topic, n, topic)
+            else:
+                print(f"📝 Generiere Skript: {topic}")
+                fut = gpt_pool.submit(generate_checked_script, topic, char_target, client)
+            scripts[fut] = n
+
+        parts, texts, errors = {}, {}, []
+        for fut in as_completed(scripts):
+            n = scripts[fut]
+            topic = topics[n - 1]
+            try:
+                text = fut.result()
+                futures = None
+                if isinstance(text, tuple):  # streamed: blocks already queued
+                    texts[n], futures = text
+                    text = "\n\n".join(texts[n])
+            except Exception as e:
+                print(f"❌ Skript fehlgeschlagen: {topic}: {e}")
+                errors.append(e)
+                continue
+            print(f"✅ Skript fertig: {topic}")
+            script_path = project_dir / f"{slugify(topic)}.md"
+            save_text(script_path, text)
+            if manifest is not None:
+                manifest.set_script(str(n), topic, script_path, text)
+
+            images_src = IMAGES_DIR / slugify(topic)
+            if images_src.exists():
+                stage_assets(images_src, project_dir / "images" / slugify(topic))
+
+            if futures is not None:
+                parts[n] = futures
+                continue
+            texts[n] = split_text_blocks(text, max_chars=max_chunk, window=window)
+            parts[n] = _submit_blocks(
+                tts_pool, texts[n], f"{basename}_{n:02d}", use_cache=use_cache, tts=tts,
+                manifest=manifest, key=str(n),
+            )
+
+        results = []
+        for n in range(1, len(topics) + 1):
+            files = []
+            for f in parts.get(n, []):
+                try:
+                    files.append(f.result())
+                except Exception as e:
+                    errors.append(e)
+            results.append(files)
+        if errors:
+            raise errors[0]
+        if blocks is not None:
+            blocks.extend(texts[n] for n in range(1, len(topics) + 1))
+        return results
+    except KeyboardInterrupt:
+        gpt_pool.shutdown(cancel_futures=True)
+        tts_pool.shutdown(cancel_futures=True)
+        raise
+    finally:
+        gpt_pool.shutdown()
+        tts_pool.shutdown()
+
+def estimate_topics(topics: List[str], char_target: int, max_chunk: int = 2500,
+                    use_cache: bool = True, manifest: Manifest | None = None,
+                    stream: bool = False) -> dict:
+    """Expected usage of :func:`run_topics` with the same arguments.
+
+    Scripts saved in *manifest* are split as :func:`run_topics` would split
+    them; only their blocks that are neither finished nor cached count. Every
+    other topic counts as one script and *char_target* characters of TTS.
+    """
+    window = 1 if stream else SPLIT_WINDOW
+    chars, scripts = 0, 0
+    for n, topic in enumerate(topics, 1):
+        done = manifest.script(str(n), topic) if manifest else None
+        if not done:
+            chars += char_target
+            scripts += 1
+            continue
+        blocks = split_text_blocks(done.read_text(encoding="utf-8"),
+                                   max_chars=max_chunk, window=window)
+        chars += sum(len(b) for i, b in enumerate(blocks)
+                     if not manifest.block(str(n), i, b)
+                     and not (use_cache and is_cached(b)))
+    return estimate_usage(chars, scripts, char_target)
+
+def _probe_audio(path) -> dict | None:
+    """Return codec, sample rate, channels and bit rate of *path* via ffprobe."""
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    proc = subprocess.run(
+        [ffprobe, "-v", "error", "-select_streams", "a:0",
+         "-show_entries", "stream=codec_name,sample_rate,channels,bit_rate",
+         "-of", "json", str(path)],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return None
+    streams = json.loads(proc.stdout or "{}").get("streams") or [None]
+    return streams[0]
+
+def _concat_escape(path) -> str:
+    return str(Path(path).resolve()).replace("'", "'\\''")
+
+def _extend_timeline(timeline: list, lengths, gaps):
+    """Append the ``(start, end)`` seconds of parts of *lengths*, each
+    followed by the matching pause of *gaps* seconds."""
+    t = 0.0
+    for length, gap in zip(lengths, gaps):
+        timeline.append((t, t + length))
+        t += length + gap
+
+def _concat_copy(files, out_path: Path, pauses: List[int],
+                 timeline: list | None = None) -> bool:
+    """Join MP3 *files* frame by frame with the ffmpeg concat demuxer.
+
+    Only possible when every part is an MP3 with the same sample rate and
+    channel count; ``pauses[i]`` ms of matching silent MP3 follow part ``i``.
+    Nothing is decoded or re-encoded. Returns ``False`` if the parts don't
+    qualify. The spans of the parts are read from the MP3 frame headers
+    into *timeline*.
+    """
+    from pydub import AudioSegment
+
+    ffmpeg = shutil.which(AudioSegment.converter)
+    infos = [_probe_audio(f) for f in files]
+    if not ffmpeg or not infos or any(
+        i is None or i.get("codec_name") != "mp3" for i in infos
+    ):
+        return False
+    formats = {(i.get("sample_rate"), i.get("channels")) for i in infos}
+    if len(formats) != 1:
+        return False
+    rate, channels = formats.pop()
+    layout = "mono" if channels == 1 else "stereo"
+    bitrate = infos[0].get("bit_rate") or "128000"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        silence = {}
+        for ms in set(pauses) - {0}:
+            silence[ms] = Path(tmp) / f"pause_{ms}.mp3"
+            subprocess.run(
+                [ffmpeg, "-v", "error", "-y", "-f", "lavfi",
+                 "-i", f"anullsrc=r={rate}:cl={layout}", "-t", f"{ms / 1000}",
+                 "-c:a", "libmp3lame", "-b:a", str(bitrate), str(silence[ms])],
+                check=True,
+            )
+        listing = Path(tmp) / "parts.txt"
+        lines = []
+        for f, ms in zip(files, pauses):
+            lines.append(f"file '{_concat_escape(f)}'")
+            if ms:
+                lines.append(f"file '{_concat_escape(silence[ms])}'")
+        listing.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        subprocess.run(
+            [ffmpeg, "-v", "error", "-y", "-f", "concat", "-safe", "0",
+             "-i", str(listing), "-c", "copy", str(out_path)],
+            check=True,
+        )
+        if timeline is not None:
+            _extend_timeline(timeline, [audio_duration(f) or 0.0 for f in files],
+                             [audio_duration(silence[ms]) or 0.0 if ms else 0.0
+                              for ms in pauses])
+    return True
+
+@contextmanager
+def _pcm_writer(out_path: Path, fmt: str, rate: int, channels: int, width: int,
+                bitrate: str | None = None):
+    """Yield a ``write(bytes)`` callable that encodes raw PCM to *out_path*.
+
+    WAV is written directly, everything else is piped through ffmpeg, so the
+    encoded output never has to exist in memory as a whole.
+    """
+    if fmt == "wav":
+        with wave.open(str(out_path), "wb") as w:
+            w.setnchannels(channels)
+            w.setsampwidth(width)
+            w.setframerate(rate)
+            yield w.writeframesraw
+        return
+
+    from pydub import AudioSegment
 
-def merge_parts(files, out_name: str, dest_dir: Path | None = None) -> Path:
-    """ Schnipsel zusammenfügen -> finale MP3 """
+    pcm = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}[width]
+    cmd = [AudioSegment.converter, "-v", "error", "-y", "-f", pcm,
+           "-ar", str(rate), "-ac", str(channels), "-i", "pipe:0"]
+    if bitrate:
+        cmd += ["-b:a", bitrate]
+    proc = subprocess.Popen(cmd + ["-f", fmt, str(out_path)], stdin=subprocess.PIPE)
+    try:
+        yield proc.stdin.write
+    finally:
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg konnte {out_path} nicht schreiben")
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ConfigError("Die Nachbearbeitung (--postprocess) braucht numpy: "
+                          "pip install numpy")
+    return numpy
+
+@lru_cache(maxsize=8)
+def _k_weighting(n: int, rate: int):
+    """Power response of the BS.1770 K-weighting filter at the rfft bins of
+    *n* samples, times the Parseval factors, divided by ``n**2``."""
+    np = _numpy()
+    w = 2 * np.pi * np.fft.rfftfreq(n)  # radians per sample
+    z1, z2 = np.exp(-1j * w), np.exp(-2j * w)
+
+    def response(b, a):
+        return np.abs((b[0] + b[1] * z1 + b[2] * z2) / (a[0] + a[1] * z1 + a[2] * z2)) ** 2
+
+    # coefficients as in libebur128; they reproduce the 48 kHz values of
+    # the standard and adapt to other sample rates
+    # stage 1: high shelf, +4 dB above ~1.7 kHz
+    K = np.tan(np.pi * 1681.974450955533 / rate)
+    Q = 0.7071752369554196
+    Vh = 10 ** (3.999843853973347 / 20)
+    Vb = Vh ** 0.4996667741545416
+    shelf = response((Vh + Vb * K / Q + K * K, 2 * (K * K - Vh), Vh - Vb * K / Q + K * K),
+                     (1 + K / Q + K * K, 2 * (K * K - 1), 1 - K / Q + K * K))
+    # stage 2: high pass at ~38 Hz
+    K = np.tan(np.pi * 38.13547087602444 / rate)
+    Q = 0.5003270373238773
+    highpass = response((1, -2, 1), (1 + K / Q + K * K, 2 * (K * K - 1), 1 - K / Q + K * K))
+
+    parseval = np.full(len(w), 2.0)
+    parseval[0] = 1.0
+    if n % 2 == 0:
+        parseval[-1] = 1.0
+    return (shelf * highpass * parseval / n ** 2).astype(np.float32)
+
+def loudness_lufs(samples, rate: int) -> float | None:
+    """Integrated loudness of *samples* (frames x channels, floats) in LUFS.
+
+    Follows ITU-R BS.1770: K-weighting (applied per 400 ms block in the
+    frequency domain), the absolute gate at -70 LUFS and the relative gate
+    at -10 LU. Blocks don't overlap, which is close enough for speech.
+    ``None`` for audio shorter than one block or entirely gated out.
+    """
+    np = _numpy()
+    block = int(0.4 * rate)
+    count = len(samples) // block
+    if not count:
+        return None
+    weights = _k_weighting(block, rate)
+    energy = np.empty(count)
+    # groups of blocks keep the spectra of long parts out of memory
+    for i in range(0, count, 64):
+        x = samples[i * block:min(count, i + 64) * block]
+        x = x.reshape(-1, block, samples.shape[1])
+        spectrum = np.abs(np.fft.rfft(x, axis=1)) ** 2
+        energy[i:i + len(x)] = np.einsum("bfc,f->b", spectrum, weights)
+    with np.errstate(divide="ignore"):
+        levels = -0.691 + 10 * np.log10(energy)
+    gated = energy[levels > -70]
+    if not gated.size:
+        return None
+    relative = -0.691 + 10 * np.log10(gated.mean()) - 10
+    gated = energy[(levels > -70) & (levels > relative)]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+def postprocess_pcm(raw: bytes, rate: int, channels: int) -> bytes:
+    """Trim edge silence of 16-bit PCM *raw* and normalize it to TARGET_LUFS."""
+    np = _numpy()
+    x = np.frombuffer(raw, dtype="<i2").reshape(-1, channels).astype(np.float32) / 32768
+    loud = np.flatnonzero(np.abs(x).max(axis=1) > 10 ** (TRIM_DB / 20))
+    if not loud.size:
+        return b""
+    keep = int(TRIM_KEEP_MS * rate / 1000)
+    x = x[max(0, loud[0] - keep):loud[-1] + 1 + keep]
+
+    lufs = loudness_lufs(x, rate)
+    if lufs is not None:
+        gain = 10 ** (min(MAX_GAIN_DB, TARGET_LUFS - lufs) / 20)
+        gain = min(gain, 10 ** (PEAK_DB / 20) / np.abs(x).max())
+        x *= gain
+    return np.clip(x * 32768, -32768, 32767).astype("<i2").tobytes()
+
+def _merge_pcm(files, out_path: Path, pauses: List[int], fmt: str,
+               bitrate: str | None = None, postprocess: bool = False,
+               timeline: list | None = None):
+    """Decode one part at a time and stream its PCM into a single encoder.
+
+    With *postprocess* every part goes through :func:`postprocess_pcm` on
+    its way, as 16-bit PCM. The spans of the parts, as written, go into
+    *timeline*.
+    """
+    from pydub import AudioSegment
+
+    first = AudioSegment.from_file(files[0])
+    rate, channels, width = first.frame_rate, first.channels, first.sample_width
+    del first
+    if postprocess:
+        width = 2
+
+    silence = {}
+
+    def pause(ms: int) -> bytes:
+        if ms not in silence:
+            silence[ms] = (AudioSegment.silent(duration=ms, frame_rate=rate)
+                           .set_channels(channels).set_sample_width(width).raw_data)
+        return silence[ms]
+
+    per_sec = rate * channels * width
+    lengths, gaps = [], []
+    with _pcm_writer(out_path, fmt, rate, channels, width, bitrate) as write:
+        for f, ms in zip(files, pauses):
+            seg = (AudioSegment.from_file(f).set_frame_rate(rate)
+                   .set_channels(channels).set_sample_width(width))
+            raw = seg.raw_data
+            del seg
+            if postprocess:
+                raw = postprocess_pcm(raw, rate, channels)
+            write(raw)
+            lengths.append(len(raw) / per_sec)
+            gaps.append(len(pause(ms)) / per_sec if ms else 0.0)
+            if ms:
+                write(pause(ms))
+    if timeline is not None:
+        _extend_timeline(timeline, lengths, gaps)
+
+def merge_parts(files, out_name: str, dest_dir: Path | None = None,
+                pause_ms: int = MERGE_PAUSE_MS, fmt: str = "mp3",
+                bitrate: str | None = None, pauses: List[int] | None = None,
+                postprocess: bool = False, timeline: list | None = None) -> Path:
+    """ Schnipsel zusammenfügen -> finale MP3
+
+    Each part is followed by ``pause_ms`` of silence, or by ``pauses[i]`` ms
+    if a list is given. MP3 parts with matching parameters are concatenated
+    without re-encoding unless a ``bitrate`` or *postprocess* is requested;
+    otherwise the parts are decoded one at a time and streamed into the
+    encoder, so memory stays at roughly one part regardless of the total
+    length. *postprocess* trims and normalizes each part on the way (see
+    :func:`postprocess_pcm`).
+
+    A *timeline* list is filled with the ``(start, end)`` seconds of every
+    part in the output, taken from the headers or the PCM that was written,
+    so no extra decode is needed (see :func:`write_chapter_index`).
+    """
     if dest_dir is None:
         dest_dir = OUT_DIR
     dest_dir.mkdir(parents=True, exist_ok=True)
 
-    combined = AudioSegment.empty()
-    pause = AudioSegment.silent(duration=350)  # 0,35s Pause
-    for f in files:
-        combined += AudioSegment.from_file(f) + pause
+    files = list(files)
+    pauses = [pause_ms] * len(files) if pauses is None else list(pauses)
+    if len(pauses) != len(files):
+        raise ValueError(f"{len(pauses)} Pausen für {len(files)} Teile")
+    if postprocess:
+        _numpy()
+    out_path = dest_dir / f"{out_name}.{fmt}"
+    with METRICS.stage("merge"):
+        if not files:
+            from pydub import AudioSegment
+            AudioSegment.empty().export(out_path, format=fmt)
+        elif (postprocess or fmt != "mp3" or bitrate
+              or not _concat_copy(files, out_path, pauses, timeline)):
+            _merge_pcm(files, out_path, pauses, fmt, bitrate, postprocess, timeline)
+    METRICS.count("merge_bytes", out_path.stat().st_size)
+    return out_path
+
+def merge_topic(files, out_name: str, dest_dir: Path | None = None,
+                mode: str = MERGE_MODE, postprocess: bool = POSTPROCESS) -> Path:
+    """Merge the parts of one topic into an intermediate for :func:`merge_final`.
+
+    In ``speed`` mode this is an MP3 joined frame by frame; in ``size`` mode a
+    lossless WAV, so the final encode is the only lossy generation.
+    """
+    fmt = "wav" if mode == "size" else "mp3"
+    return merge_parts(files, out_name, dest_dir=dest_dir, fmt=fmt,
+                       postprocess=postprocess)
+
+def merge_final(topic_files, out_name: str, dest_dir: Path | None = None,
+                mode: str = MERGE_MODE, pause_ms: int = TOPIC_PAUSE_MS,
+                pauses: List[int] | None = None, postprocess: bool = False,
+                timeline: list | None = None) -> Path:
+    """Assemble topic intermediates from :func:`merge_topic` into the final MP3.
+
+    ``speed`` concatenates the topic MP3s without decoding them again,
+    ``size`` encodes the WAV intermediates once at :data:`SIZE_BITRATE`.
+    Topics are separated by ``pause_ms``; callers passing the raw parts
+    instead give per-part ``pauses`` and *postprocess*.
+    """
+    bitrate = SIZE_BITRATE if mode == "size" else None
+    return merge_parts(topic_files, out_name, dest_dir=dest_dir, bitrate=bitrate,
+                       pause_ms=pause_ms, pauses=pauses, postprocess=postprocess,
+                       timeline=timeline)
+
+def _merge_topic_job(files, out_name: str, dest_dir: Path, **options):
+    """Process-pool job of :func:`merge_topics`: the topic file and its spans."""
+    timeline = []
+    return merge_parts(files, out_name, dest_dir, timeline=timeline, **options), timeline
+
+def merge_topics(per_topic: List[List[Path]], out_name: str, dest_dir: Path | None = None,
+                 mode: str = MERGE_MODE, pause_ms: int = MERGE_PAUSE_MS,
+                 topic_pause_ms: int = TOPIC_PAUSE_MS, postprocess: bool = False,
+                 processes: int = MERGE_PROCESSES, timeline: list | None = None) -> Path:
+    """Merge the parts of a multi-topic run, one topic per process.
+
+    Decoding, post-processing and encoding are CPU-bound, so every topic is
+    rendered to its own MP3 in a pool of *processes*; only file paths cross
+    the process boundary. In ``size`` mode the topics are encoded at
+    :data:`SIZE_BITRATE`, which stays the only lossy generation. The topic
+    MP3s are then joined frame by frame with *topic_pause_ms* between them,
+    which neither decodes nor encodes. *timeline* gets the spans of all
+    parts, as in :func:`merge_parts`.
+    """
+    if dest_dir is None:
+        dest_dir = OUT_DIR
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    topics = [list(files) for files in per_topic if files]
+    if len(topics) < 2 or processes < 2:
+        files = [f for t in topics for f in t]
+        pauses = [pause_ms] * len(files)
+        end = 0
+        for t in topics[:-1]:
+            end += len(t)
+            pauses[end - 1] = topic_pause_ms
+        return merge_final(files, out_name, dest_dir, mode, pauses=pauses,
+                           postprocess=postprocess, timeline=timeline)
+
+    bitrate = SIZE_BITRATE if mode == "size" else None
     out_path = dest_dir / f"{out_name}.mp3"
-    combined.export(out_path, format="mp3")
+    with tempfile.TemporaryDirectory(dir=dest_dir) as tmp, \
+            ProcessPoolExecutor(max_workers=min(processes, len(topics))) as pool:
+        with METRICS.stage("merge"):
+            futures = [
+                pool.submit(_merge_topic_job, files, f"topic_{n:02d}", Path(tmp),
+                            fmt="mp3", bitrate=bitrate,
+                            pauses=[pause_ms] * (len(files) - 1) + [0],
+                            postprocess=postprocess)
+                for n, files in enumerate(topics, 1)
+            ]
+            rendered, spans = zip(*(f.result() for f in futures))
+            pauses = [topic_pause_ms] * (len(rendered) - 1) + [pause_ms]
+            topic_spans = []
+            if not _concat_copy(rendered, out_path, pauses, topic_spans):
+                _merge_pcm(rendered, out_path, pauses, "mp3", bitrate,
+                           timeline=topic_spans)
+    if timeline is not None:
+        for (offset, _), parts in zip(topic_spans, spans):
+            timeline.extend((offset + a, offset + b) for a, b in parts)
+    METRICS.count("merge_bytes", out_path.stat().st_size)
     return out_path
 
+# ------------------ Kapitel / Untertitel ------------------
+def chapter_index(topics, timeline: list, audio_file: Path | None = None) -> dict:
+    """Map topics, blocks and paragraphs to their times in the merged audio.
+
+    *topics* is a list of ``(title, blocks)`` in merge order, *timeline* the
+    ``(start, end)`` of every block's part as filled in by :func:`merge_parts`.
+    Paragraphs aren't measured: the time of a block is shared among its
+    paragraphs by character count.
+    """
+    if len(timeline) != sum(len(blocks) for _, blocks in topics):
+        raise ValueError(f"{len(timeline)} Zeitspannen für "
+                         f"{sum(len(b) for _, b in topics)} Blöcke")
+    spans = iter(timeline)
+    entries = []
+    for title, blocks in topics:
+        block_entries = []
+        for i, block in enumerate(blocks):
+            start, end = next(spans)
+            paras = list(_paragraphs(block))
+            total = sum(map(len, paras)) or 1
+            t, paragraphs = start, []
+            for para in paras:
+                length = (end - start) * len(para) / total
+                paragraphs.append({"start": round(t, 3), "end": round(t + length, 3),
+                                   "text": para})
+                t += length
+            block_entries.append({"index": i, "start": round(start, 3),
+                                  "end": round(end, 3), "paragraphs": paragraphs})
+        entries.append({
+            "title": title,
+            "start": block_entries[0]["start"] if block_entries else None,
+            "end": block_entries[-1]["end"] if block_entries else None,
+            "blocks": block_entries,
+        })
+    return {
+        "file": audio_file.name if audio_file else None,
+        "duration": round(timeline[-1][1], 3) if timeline else 0.0,
+        "topics": entries,
+    }
+
+def _timestamp(seconds: float, srt: bool = False) -> str:
+    ms = round(seconds * 1000)
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    if srt:
+        return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+def youtube_chapters(index: dict) -> str:
+    """Chapter list for a YouTube description: one line per topic.
+
+    YouTube wants the first chapter at 0:00, so it is moved there.
+    """
+    lines = []
+    for topic in index["topics"]:
+        if topic["start"] is not None:
+            start = topic["start"] if lines else 0.0
+            lines.append(f"{_timestamp(start)} {topic['title']}")
+    return "\n".join(lines) + "\n"
+
+def subtitles_srt(index: dict) -> str:
+    """SRT subtitles with one cue per sentence, timed like :func:`chapter_index`."""
+    cues = []
+    for topic in index["topics"]:
+        for block in topic["blocks"]:
+            for para in block["paragraphs"]:
+                sentences = [x for x in _SPLIT_LEVELS[0].split(para["text"]) if x.strip()]
+                total = sum(map(len, sentences)) or 1
+                t = para["start"]
+                for sentence in sentences:
+                    length = (para["end"] - para["start"]) * len(sentence) / total
+                    cues.append((t, t + length, " ".join(sentence.split())))
+                    t += length
+    return "\n".join(
+        f"{i}\n{_timestamp(a, srt=True)} --> {_timestamp(b, srt=True)}\n{text}\n"
+        for i, (a, b, text) in enumerate(cues, 1)
+    )
+
+def write_chapter_index(audio_file: Path, topics, timeline: list) -> Path:
+    """Write ``<name>.chapters.json``, ``<name>.chapters.txt`` (YouTube
+    chapters) and ``<name>.srt`` next to *audio_file*; return the JSON path."""
+    index = chapter_index(topics, timeline, audio_file)
+    path = audio_file.with_name(f"{audio_file.stem}.chapters.json")
+    path.write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding="utf-8")
+    save_text(audio_file.with_name(f"{audio_file.stem}.chapters.txt"), youtube_chapters(index))
+    save_text(audio_file.with_suffix(".srt"), subtitles_srt(index))
+    print(f"🔖 Kapitel: {path}")
+    return path
+
+# ------------------ Projekte / Batch ------------------
+def project_slug(basename: str) -> str:
+    """Topic part of a draft basename (``<id>_<topic>``) that names its project."""
+    return basename.split("_", 1)[1] if "_" in basename else basename
+
+def approve_draft(draft_path: Path, basename: str | None = None, max_chunk: int = 2500,
+                  workers: int = TTS_WORKERS, use_cache: bool = True, resume: bool = False,
+                  merge_mode: str = MERGE_MODE, pause_ms: int = MERGE_PAUSE_MS,
+                  postprocess: bool = POSTPROCESS, pool=None) -> Path:
+    """Approve *draft_path* and turn it into audio; return the final file.
+
+    The script is copied to ``approved/`` and ``projects/<topic>/``, split,
+    synthesized and merged, and a chapter index is written next to the
+    audio (see :func:`write_chapter_index`). The expected TTS usage (blocks
+    not in the cache) is checked against the budget before anything is
+    sent, and the usage is booked into ``ledger.jsonl``. With *pool* the
+    blocks are queued on that shared executor (see :func:`run_batch`)
+    instead of a pool of ``workers``.
+    """
+    # In approved kopieren
+    text = draft_path.read_text(encoding="utf-8").strip()
+    approved_path = APPROVED_DIR / draft_path.name
+    save_text(approved_path, text)
+    print(f"✅ Approved gespeichert: {approved_path}")
+
+    topic_slug = project_slug(basename or approved_path.stem)
+    project_dir = PROJECTS_DIR / slugify(topic_slug)
+    project_dir.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest(project_dir / "manifest.json", resume=resume)
+
+    save_text(project_dir / f"{topic_slug}.md", text)
+    manifest.set_script(topic_slug, topic_slug, project_dir / f"{topic_slug}.md", text)
+
+    images_src = IMAGES_DIR / slugify(topic_slug)
+    if images_src.exists():
+        stage_assets(images_src, project_dir / "images")
+
+    blocks = split_text_blocks(text, max_chars=max_chunk)
+    print(f"Chunks: {len(blocks)}")
+
+    try:
+        preflight(estimate_usage(sum(
+            len(b) for b in blocks if not (use_cache and is_cached(b))
+        )))
+        if pool is None:
+            mp3_files = tts_blocks(blocks, topic_slug, workers=workers,
+                                   use_cache=use_cache, manifest=manifest)
+        else:
+            futures = _submit_blocks(pool, blocks, topic_slug, use_cache=use_cache,
+                                     manifest=manifest, key=topic_slug)
+            mp3_files = [f.result() for f in futures]
+    finally:
+        close_ledger(project_dir / "ledger.jsonl", topic_slug)
+
+    timeline = []
+    final_file = merge_final(mp3_files, topic_slug, dest_dir=project_dir, mode=merge_mode,
+                             pause_ms=pause_ms, postprocess=postprocess, timeline=timeline)
+    write_chapter_index(final_file, [(topic_slug, blocks)], timeline)
+    return final_file
+
+class DraftLock:
+    """Claim on one draft, safe across processes and machines sharing ``drafts/``.
+
+    The claim is ``<draft>.lock``, created with ``O_EXCL`` and naming its
+    holder. The holder refreshes it with :meth:`touch`; a lock older than
+    ``stale`` seconds belongs to a crashed worker and is taken over. When the
+    draft is finished the lock becomes ``<draft>.done``, so later batches
+    skip it until the draft is edited again. A holder whose lock was taken
+    over neither refreshes nor removes the new one.
+    """
+
+    def __init__(self, draft: Path, stale: float = BATCH_LOCK_STALE):
+        import socket
+
+        self.draft = draft
+        self.path = draft.with_name(draft.name + ".lock")
+        self.done_path = draft.with_name(draft.name + ".done")
+        self.stale = stale
+        self.holder = {"host": socket.gethostname(), "pid": os.getpid(),
+                       "token": uuid.uuid4().hex}
+
+    def is_done(self) -> bool:
+        try:
+            return self.done_path.stat().st_mtime >= self.draft.stat().st_mtime
+        except FileNotFoundError:
+            return False
+
+    def _age(self, path: Path) -> float:
+        return time.time() - path.stat().st_mtime
+
+    def owned(self) -> bool:
+        """Whether the lock file still names this holder."""
+        try:
+            holder = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return False
+        return all(holder.get(k) == v for k, v in self.holder.items())
+
+    def acquire(self) -> bool:
+        """Take the claim; ``False`` if someone else holds a live one."""
+        holder = json.dumps(dict(self.holder, since=time.time()))
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    if self._age(self.path) < self.stale:
+                        return False
+                    # move the stale lock aside first, so only one taker wins
+                    grave = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex}")
+                    os.rename(self.path, grave)
+                except FileNotFoundError:
+                    continue
+                if self._age(grave) < self.stale:  # refreshed meanwhile: give it back
+                    os.rename(grave, self.path)
+                    return False
+                print(f"🔓 Verwaister Lock übernommen: {self.path.name}")
+                grave.unlink(missing_ok=True)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(holder)
+            return True
+        return False
+
+    def touch(self):
+        if not self.owned():
+            return
+        try:
+            os.utime(self.path)
+        except FileNotFoundError:
+            pass
+
+    def release(self, result: dict | None = None):
+        """Drop the claim; with *result* the draft is marked as done."""
+        if result is not None:
+            self.done_path.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+        if self.owned():
+            self.path.unlink(missing_ok=True)
+        else:
+            print(f"⚠️ Lock nicht mehr unserer, bleibt liegen: {self.path.name}")
+
+def load_jobs(value: str | None) -> List[dict]:
+    """Batch jobs from a jobs file, or every unfinished draft in ``drafts/``.
+
+    A jobs file has one job per line: a draft file name or ``topic: <Topic>``
+    (generated without review into ``drafts/batch_<topic>.md``), optionally
+    followed by ``| <priority>``. Lines starting with ``#`` are comments; a
+    line with a bad priority is reported and skipped.
+    Higher priorities run first, then file order; drafts found by scanning
+    run oldest first.
+    """
+    if not value:
+        drafts = sorted(DRAFT_DIR.glob("*.md"), key=lambda p: (p.stat().st_mtime, p.name))
+        return [{"draft": p.name, "priority": 0} for p in drafts]
+
+    jobs = []
+    lines = Path(value).read_text(encoding="utf-8").splitlines()
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        entry, _, prio = line.rpartition("|") if "|" in line else (line, "", "0")
+        entry = entry.strip()
+        try:
+            job = {"priority": int(prio.strip() or 0)}
+        except ValueError:
+            print(f"⚠️ {value}:{lineno}: ungültige Priorität '{prio.strip()}', "
+                  f"Zeile übersprungen")
+            continue
+        if entry.lower().startswith("topic:"):
+            job["topic"] = entry[6:].strip()
+        else:
+            job["draft"] = entry
+        jobs.append(job)
+    return sorted(jobs, key=lambda j: -j["priority"])
+
+def _job_name(job: dict) -> str:
+    return job.get("draft") or f"topic: {job['topic']}"
+
+def run_batch(jobs: List[dict], parallel: int = BATCH_PROJECTS,
+              workers: int = TTS_WORKERS, gpt_workers: int = GPT_WORKERS,
+              char_target: int = 7000, **options) -> List[dict]:
+    """Produce many projects with shared, global concurrency limits.
+
+    Up to *parallel* projects run at once. Their TTS blocks share one pool of
+    *workers* threads and script generation for ``topic:`` jobs is limited to
+    *gpt_workers* calls, however many projects are in flight. Jobs are
+    claimed in priority order through :class:`DraftLock`, so several
+    processes can work on the same ``drafts/`` folder. *options* go to
+    :func:`approve_draft`. Returns one report entry per job; a failed job
+    doesn't stop the others.
+    """
+    gpt_slots = threading.BoundedSemaphore(max(1, gpt_workers))
+    held = set()
+    held_lock = threading.Lock()
+    stop = threading.Event()
+    projects = {}
+
+    def heartbeat():
+        while not stop.wait(BATCH_HEARTBEAT):
+            with held_lock:
+                for lock in list(held):
+                    lock.touch()
+
+    def run(job: dict) -> dict:
+        started = time.perf_counter()
+        report = {"job": _job_name(job), "priority": job["priority"]}
+        draft = DRAFT_DIR / (job.get("draft") or f"batch_{slugify(job['topic'])}.md")
+        lock = DraftLock(draft)
+        if lock.is_done():
+            return dict(report, status="already done")
+        if "topic" not in job and not draft.exists():
+            return dict(report, status="missing")
+        slug = slugify(project_slug(draft.stem))
+        with held_lock:
+            if projects.setdefault(slug, draft.name) != draft.name:
+                return dict(report, status="duplicate", error=f"Projekt {slug} schon im Batch")
+        if not lock.acquire():
+            return dict(report, status="claimed elsewhere")
+        if lock.is_done():  # finished by another worker since the first check
+            lock.release()
+            return dict(report, status="already done")
+        with held_lock:
+            held.add(lock)
+        result = None
+        try:
+            if not draft.exists():
+                with gpt_slots:
+                    text = generate_checked_script(job["topic"], char_target)
+                save_text(draft, text)
+            final = approve_draft(draft, pool=tts_pool, **options)
+            result = {"output": str(final), "finished": time.time()}
+        except Exception as e:
+            print(f"❌ {draft.name}: {e}")
+            status = "over budget" if isinstance(e, BudgetExceeded) else "failed"
+            return dict(report, status=status, error=str(e),
+                        seconds=round(time.perf_counter() - started, 1))
+        finally:
+            # also on SystemExit and the like, so other workers needn't
+            # wait for the lock to go stale
+            with held_lock:
+                held.discard(lock)
+            lock.release(result)
+        print(f"🎧 Fertig: {final}")
+        return dict(report, status="done", output=str(final),
+                    seconds=round(time.perf_counter() - started, 1))
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    tts_pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as project_pool:
+            futures = [project_pool.submit(run, job) for job in jobs]
+            reports = []
+            for job, f in zip(jobs, futures):
+                # exception() waits like result(), but hands back even a
+                # SystemExit of the job, so the report is always complete
+                error = f.exception()
+                if error is None:
+                    reports.append(f.result())
+                else:
+                    reports.append({"job": _job_name(job), "priority": job["priority"],
+                                    "status": "failed",
+                                    "error": str(error) or type(error).__name__})
+            return reports
+    finally:
+        stop.set()
+        tts_pool.shutdown()
+
+def estimate_jobs(jobs: List[dict], char_target: int = 7000) -> dict:
+    """Expected usage of the batch *jobs* that aren't done yet."""
+    chars, scripts = 0, 0
+    for job in jobs:
+        draft = DRAFT_DIR / (job.get("draft") or f"batch_{slugify(job['topic'])}.md")
+        if DraftLock(draft).is_done():
+            continue
+        if draft.exists():
+            chars += len(draft.read_text(encoding="utf-8").strip())
+        elif "topic" in job:
+            chars += char_target
+            scripts += 1
+    return estimate_usage(chars, scripts, char_target)
+
+def print_batch_report(reports: List[dict]):
+    for r in reports:
+        extra = r.get("output") or r.get("error") or ""
+        seconds = f"{r['seconds']:>7.1f}s" if "seconds" in r else " " * 8
+        print(f"{r['status']:<18} {r['priority']:>3} {seconds}  {r['job']}  {extra}")
+    counts = {}
+    for r in reports:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    print("📋 Batch:", ", ".join(f"{n}× {status}" for status, n in counts.items()))
+
 # ------------------ CLI ------------------
 def main():
+    global TTS_BACKEND
     import argparse
     ap = argparse.ArgumentParser(description="Generate & TTS YouTube scripts")
     ap.add_argument("--generate", action="store_true",
@@ -287,41 +2736,100 @@ def main():
                     help="Max Zeichen pro TTS-Chunk")
     ap.add_argument("--approve", metavar="DATEI",
                     help="Draft freigeben & Audio erzeugen")
+    ap.add_argument("--batch", nargs="?", const="", metavar="JOBS",
+                    help="Alle offenen Drafts (oder die Jobs-Datei) abarbeiten")
+    ap.add_argument("--parallel", type=int, default=BATCH_PROJECTS,
+                    help="Gleichzeitige Projekte bei --batch")
     ap.add_argument("--basename", default=None,
                     help="Basisname für Audio-Dateien")
+    ap.add_argument("--tts", choices=TTS_BACKENDS, default=TTS_BACKEND,
+                    help="TTS-Engine: elevenlabs, command (TTS_COMMAND) oder fake")
+    ap.add_argument("--workers", type=int, default=TTS_WORKERS,
+                    help="Parallele ElevenLabs-Anfragen")
+    ap.add_argument("--gpt-workers", type=int, default=GPT_WORKERS,
+                    help="Parallele GPT-Anfragen (bei --topics)")
+    ap.add_argument("--stream", action="store_true", default=GPT_STREAM,
+                    help="GPT-Antwort streamen und Blöcke sofort vertonen "
+                         "(bei --topics)")
+    ap.add_argument("--resume", action="store_true",
+                    help="Abgebrochenes Projekt fortsetzen (manifest.json)")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="TTS-Cache ignorieren und alle Chunks neu erzeugen")
+    ap.add_argument("--merge-mode", choices=MERGE_MODES, default=MERGE_MODE,
+                    help="speed: MP3 ohne Neukodierung, size: eine Kodierung mit SIZE_BITRATE")
+    ap.add_argument("--pause-ms", type=int, default=MERGE_PAUSE_MS,
+                    help="Pause nach jedem Chunk in ms")
+    ap.add_argument("--topic-pause-ms", type=int, default=TOPIC_PAUSE_MS,
+                    help="Pause zwischen Topics in ms (bei --topics)")
+    ap.add_argument("--merge-processes", type=int, default=MERGE_PROCESSES,
+                    help="Prozesse, die Topics parallel zusammenfügen (bei --topics)")
+    ap.add_argument("--postprocess", action="store_true", default=POSTPROCESS,
+                    help="Stille an Chunk-Rändern kürzen und Lautheit auf "
+                         "TARGET_LUFS angleichen (braucht numpy)")
+    ap.add_argument("--max-chars", type=int, default=MAX_CHARS,
+                    help="Budget: höchstens so viele TTS-Zeichen (0 = ohne Limit)")
+    ap.add_argument("--max-cost", type=float, default=MAX_COST,
+                    help="Budget: höchstens so viele USD für GPT und TTS (0 = ohne Limit)")
+    ap.add_argument("--prune-cache", action="store_true",
+                    help="TTS-Cache auf ELEVEN_CACHE_MB verkleinern und "
+                         "unbenutzte Assets löschen")
 
     args = ap.parse_args()
+    use_cache = not args.no_cache
+    TTS_BACKEND = args.tts
+    ensure_dirs()
+    METRICS.reset()
+    USAGE.reset(args.max_chars, args.max_cost)
+
+    if args.prune_cache:
+        removed = TTS_CACHE.prune()
+        print(f"🧹 Cache: {removed} Einträge entfernt, "
+              f"{TTS_CACHE.size() / 1024 / 1024:.1f} MB belegt")
+        print(f"🧹 Assets: {ASSETS.prune()} unbenutzte Dateien entfernt")
+        if not (args.topics or args.generate or args.approve or args.batch is not None):
+            return
 
     if args.topics:
         topics = load_topics(args.topics)
         if not topics:
             ap.error("Keine Topics gefunden")
 
+        if args.resume and not args.basename:
+            ap.error("--resume braucht --basename")
         basename = args.basename or f"combined_{uuid.uuid4().hex[:8]}"
-        char_target = calc_target_per_topic(len(topics))
+        char_target = calc_target_per_topic(len(topics), max_chunk=args.max_chunk)
+        print(f"🎯 {char_target} Zeichen pro Topic "
+              f"({CALIBRATION.chars_per_min(voice_key()):.0f} Zeichen/min)")
 
         project_dir = PROJECTS_DIR / slugify(basename)
         project_dir.mkdir(parents=True, exist_ok=True)
+        manifest = Manifest(project_dir / "manifest.json", resume=args.resume)
+        check_config(gpt=any(not manifest.script(str(n), t) for n, t in enumerate(topics, 1)),
+                     tts=True, postprocess=args.postprocess)
 
-        mp3_files = []
-        idx = 0
-        for topic in topics:
-            print(f"📝 Generiere Skript: {topic}")
-            text = generate_script(topic, char_target)
-            save_text(project_dir / f"{slugify(topic)}.md", text)
-
-            images_src = IMAGES_DIR / slugify(topic)
-            if images_src.exists():
-                dest = project_dir / "images" / slugify(topic)
-                shutil.copytree(images_src, dest, dirs_exist_ok=True)
-
-            blocks = split_text_blocks(text, max_chars=args.max_chunk)
-            for block in blocks:
-                idx += 1
-                print(f"TTS {idx} …")
-                mp3_files.append(tts_chunk(block, idx, basename))
-
-        final_file = merge_parts(mp3_files, slugify(basename), dest_dir=project_dir)
+        preflight(estimate_topics(topics, char_target, args.max_chunk, use_cache,
+                                  manifest, args.stream))
+        blocks = []
+        try:
+            per_topic = run_topics(
+                topics, basename, project_dir, char_target,
+                max_chunk=args.max_chunk, gpt_workers=args.gpt_workers,
+                workers=args.workers, use_cache=use_cache, manifest=manifest,
+                stream=args.stream, blocks=blocks,
+            )
+        finally:
+            close_ledger(project_dir / "ledger.jsonl")
+        timeline = []
+        final_file = merge_topics(per_topic, slugify(basename), dest_dir=project_dir,
+                                  mode=args.merge_mode, pause_ms=args.pause_ms,
+                                  topic_pause_ms=args.topic_pause_ms,
+                                  postprocess=args.postprocess,
+                                  processes=args.merge_processes, timeline=timeline)
+        write_chapter_index(final_file, list(zip(topics, blocks)), timeline)
+        TTS_CACHE.prune()
+        CALIBRATION.save()
+        print("🗄️ Cache:", TTS_CACHE.stats())
+        print("📊 Metriken:", METRICS.write(project_dir / "metrics.json"))
         print("🎧 Fertig:", final_file)
         return
 
@@ -329,10 +2837,14 @@ def main():
         if not args.topic:
             ap.error("--topic ist Pflicht bei --generate")
 
-        text = generate_script(args.topic, args.chars)
+        check_config(gpt=True)
+        preflight(estimate_usage(0, 1, args.chars))
+        text = generate_checked_script(args.topic, args.chars)
         fname = f"{uuid.uuid4().hex[:8]}_{re.sub(r'[^a-z0-9]+', '-', args.topic.lower())}.md"
         draft_path = DRAFT_DIR / fname
         save_text(draft_path, text)
+        # the project the draft will be approved into
+        close_ledger(PROJECTS_DIR / slugify(project_slug(draft_path.stem)) / "ledger.jsonl")
 
         print(f"📜 Draft gespeichert: {draft_path}")
         print(f"Zeichen: {count_chars(text)} (Ziel {args.chars} ±10%)")
@@ -345,39 +2857,51 @@ def main():
         if not draft_path.exists():
             ap.error(f"Draft nicht gefunden: {draft_path}")
 
-        # In approved kopieren
-        text = draft_path.read_text(encoding="utf-8").strip()
-        approved_path = APPROVED_DIR / draft_path.name
-        save_text(approved_path, text)
-        print(f"✅ Approved gespeichert: {approved_path}")
-
-        basename = args.basename or approved_path.stem
-        topic_slug = basename.split("_", 1)[1] if "_" in basename else basename
-
-        project_dir = PROJECTS_DIR / slugify(topic_slug)
-        project_dir.mkdir(parents=True, exist_ok=True)
-
-        save_text(project_dir / f"{topic_slug}.md", text)
-
-        images_src = IMAGES_DIR / slugify(topic_slug)
-        if images_src.exists():
-            dest = project_dir / "images"
-            shutil.copytree(images_src, dest, dirs_exist_ok=True)
-
-        blocks = split_text_blocks(text, max_chars=args.max_chunk)
-        print(f"Chunks: {len(blocks)}")
-
-        mp3_files = []
-        for i, block in enumerate(blocks):
-            print(f"TTS {i+1}/{len(blocks)} …")
-            mp3_files.append(tts_chunk(block, i, topic_slug))
-
-        final_file = merge_parts(mp3_files, topic_slug, dest_dir=project_dir)
+        check_config(tts=True, postprocess=args.postprocess)
+        final_file = approve_draft(
+            draft_path, args.basename, max_chunk=args.max_chunk, workers=args.workers,
+            use_cache=use_cache, resume=args.resume, merge_mode=args.merge_mode,
+            pause_ms=args.pause_ms, postprocess=args.postprocess,
+        )
+        TTS_CACHE.prune()
+        CALIBRATION.save()
+        print("🗄️ Cache:", TTS_CACHE.stats())
+        print("📊 Metriken:", METRICS.write(final_file.parent / "metrics.json"))
         print("🎧 Fertig:", final_file)
         return
 
+    if args.batch is not None:
+        jobs = load_jobs(args.batch)
+        if not jobs:
+            ap.error("Keine Jobs gefunden")
+        check_config(gpt=any("topic" in j for j in jobs), tts=True,
+                     postprocess=args.postprocess)
+        preflight(estimate_jobs(jobs, args.chars))
+        reports = run_batch(
+            jobs, parallel=args.parallel, workers=args.workers,
+            gpt_workers=args.gpt_workers, char_target=args.chars,
+            max_chunk=args.max_chunk, use_cache=use_cache, resume=args.resume,
+            merge_mode=args.merge_mode, pause_ms=args.pause_ms,
+            postprocess=args.postprocess,
+        )
+        TTS_CACHE.prune()
+        CALIBRATION.save()
+        print_batch_report(reports)
+        report_path = PROJECTS_DIR / f"batch_{time.strftime('%Y%m%d-%H%M%S')}.json"
+        usage = Usage.totals(USAGE.entries)
+        report_path.write_text(json.dumps({"jobs": reports, "metrics": METRICS.snapshot(),
+                                           "usage": usage},
+                                          indent=2, ensure_ascii=False), encoding="utf-8")
+        print("📋 Bericht:", report_path)
+        if any(r["status"] in ("failed", "over budget") for r in reports):
+            raise SystemExit(1)
+        return
+
     # Wenn nichts angegeben:
     ap.print_help()
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except (BudgetExceeded, ConfigError) as e:
+        raise SystemExit(f"❌ {e}")
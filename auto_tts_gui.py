@@ -1,81 +1,88 @@
+import itertools
 import os
 import re
+import time
+import traceback
 import uuid
+import queue
 import subprocess
-import shutil
 import tkinter as tk
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from io import BytesIO
-from tkinter import simpledialog, messagebox, scrolledtext
+from tkinter import messagebox, scrolledtext, ttk
 
 import requests
 from PIL import Image, ImageTk
 
 from auto_tts import (
-    generate_script,
+    generate_checked_script,
     split_text_blocks,
-    tts_chunk,
-    merge_parts,
+    _submit_blocks,
+    TTS_WORKERS,
+    merge_topic,
+    merge_final,
+    write_chapter_index,
+    MERGE_MODE,
+    MERGE_MODES,
+    POSTPROCESS,
+    GPT_WORKERS,
     calc_target_per_topic,
+    CALIBRATION,
+    close_ledger,
     search_wikimedia_images,
+    request,
+    CircuitOpen,
+    ConfigError,
+    check_config,
     slugify,
+    stage_assets,
     IMAGES_DIR,
-    USER_AGENT,
     PROJECTS_DIR,
+    ensure_dirs,
     save_text,
 )
 
+# previews downloaded ahead of the one currently shown
+PREFETCH = 4
+PREVIEW_SIZE = (500, 500)
+# how often the UI thread picks up results from the workers
+POLL_MS = 100
+# background threads for image search, downloads, waiting on TTS and merging
+WORK_THREADS = 4
+# per-topic stages shown in the job list, in pipeline order
+STAGES = ("script", "review", "images", "tts", "merge", "audio")
 
-def ask_topics():
-    root = tk.Tk()
-    root.withdraw()
-    data = simpledialog.askstring(
-        "Topics",
-        "Enter topics separated by commas or newlines:",
-        parent=root,
-    )
-    root.destroy()
-    if not data:
-        return []
-    return [t.strip() for t in re.split(r"[,\n]", data) if t.strip()]
-
-
-def show_text(text):
-    approved = False
-
-    def approve():
-        nonlocal approved
-        approved = True
-        win.destroy()
 
-    win = tk.Tk()
-    win.title("Approve Script")
-    st = scrolledtext.ScrolledText(win, width=80, height=30)
-    st.insert(tk.END, text)
-    st.pack(fill=tk.BOTH, expand=True)
-    tk.Button(win, text="Approve", command=approve).pack()
-    win.mainloop()
-    return approved
+def parse_topics(data: str) -> list:
+    return [t.strip() for t in re.split(r"[,\n]", data) if t.strip()]
 
 
-def confirm_audio(path: str) -> bool:
-    root = tk.Tk()
-    root.withdraw()
+def open_file(path) -> None:
     if os.name == "nt":
         os.startfile(path)
     else:
-        subprocess.Popen(["xdg-open", path])
-    res = messagebox.askyesno("Approve Audio", f"Approve audio file {path}?")
-    root.destroy()
-    return res
+        subprocess.Popen(["xdg-open", str(path)])
 
 
-def _collect_synonyms(phrase: str, max_terms: int = 5) -> list:
-    """Return a list of simple synonyms for words in *phrase* using WordNet."""
+@lru_cache(maxsize=1)
+def _wordnet():
+    """Import and load the WordNet corpus once; ``None`` if unavailable."""
     try:
         from nltk.corpus import wordnet as wn
+        wn.ensure_loaded()
     except Exception as e:
         print(f"Synonym lookup failed: {e}")
-        return []
+        return None
+    return wn
+
+
+@lru_cache(maxsize=256)
+def _synonyms(phrase: str, max_terms: int) -> tuple:
+    wn = _wordnet()
+    if wn is None:
+        return ()
 
     terms = set()
     for token in re.findall(r"[A-Za-z]+", phrase):
@@ -90,130 +97,480 @@ def _collect_synonyms(phrase: str, max_terms: int = 5) -> list:
                 break
         if len(terms) >= max_terms:
             break
-    return list(terms)[:max_terms]
+    return tuple(terms)[:max_terms]
 
 
-def select_images(topic: str, limit: int = 20):
-    """Show Wikimedia images for *topic* and let the user choose which to keep."""
+def _collect_synonyms(phrase: str, max_terms: int = 5) -> list:
+    """Return a list of simple synonyms for words in *phrase* using WordNet."""
+    return list(_synonyms(phrase, max_terms))
+
+
+def find_images(topic: str, limit: int = 20) -> list:
+    """Search Wikimedia for *topic* and a few WordNet synonyms."""
     queries = [topic] + _collect_synonyms(topic)
     images = search_wikimedia_images(queries, limit=limit)
     print(f"Found {len(images)} image(s) for {topic}")
-    if not images:
-        return []
+    return images
 
-    dest = IMAGES_DIR / slugify(topic)
-    dest.mkdir(parents=True, exist_ok=True)
-    saved = []
 
-    for idx, img in enumerate(images, 1):
-        r = None
-        headers = {"User-Agent": USER_AGENT}
+def _load_preview(img: dict):
+    """Download the scaled preview of *img* and shrink it to PREVIEW_SIZE."""
+    url = img.get("thumb") or img["url"]
+    try:
+        r = request("images", "GET", url, retries=1, timeout=15)
+        r.raise_for_status()
+        pil_img = Image.open(BytesIO(r.content))
+        pil_img.thumbnail(PREVIEW_SIZE)
+    except Exception as e:
+        print(f"Failed to load preview {url}: {e}")
+        return None
+    return pil_img
+
+
+def _download_full(img: dict, out_path):
+    """Stream the full-resolution file of *img* to *out_path*.
+
+    The file is written next to it as ``.part`` and swapped in when complete,
+    so an existing *out_path* is never rewritten in place.
+    """
+    tmp = out_path.with_name(out_path.name + ".part")
+    try:
+        with request("images", "GET", img["url"], timeout=15, stream=True) as r:
+            r.raise_for_status()
+            with open(tmp, "wb") as f:
+                for chunk in r.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+        os.replace(tmp, out_path)
+    except (requests.RequestException, CircuitOpen):
+        tmp.unlink(missing_ok=True)
+        raise
+    return out_path
+
+
+class Previews:
+    """Loads image previews on worker threads, a few ahead of the one shown."""
+
+    def __init__(self, images: list, ahead: int = PREFETCH):
+        self.images = images
+        self.ahead = ahead
+        self._pool = ThreadPoolExecutor(max_workers=ahead)
+        self._futures = {}
+
+    def get(self, i: int):
+        """Return the future for preview *i* and queue the following ones."""
+        for j in range(i, min(i + self.ahead + 1, len(self.images))):
+            if j not in self._futures:
+                self._futures[j] = self._pool.submit(_load_preview, self.images[j])
+        for j in [j for j in self._futures if j < i]:
+            del self._futures[j]
+        return self._futures[i]
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class App:
+    """The whole workflow in one window.
+
+    GPT, image search, TTS and merging run on background threads. Workers
+    never touch Tk; they hand callbacks to :meth:`post`, which the UI thread
+    drains every ``POLL_MS``. Reviews (script, images, audio) are queued and
+    shown one at a time in the review pane, so topic N can be reviewed while
+    topic N+1 is still being generated.
+    """
+
+    def __init__(self, root: tk.Tk, merge_mode: str = MERGE_MODE,
+                 postprocess: bool = POSTPROCESS):
+        self.root = root
+        self.merge_mode = merge_mode
+        self.postprocess = postprocess
+        self.events = queue.Queue()
+        self.gpt_pool = ThreadPoolExecutor(max_workers=GPT_WORKERS)
+        self.work_pool = ThreadPoolExecutor(max_workers=WORK_THREADS)
+        # one pool for the blocks of all topics, so ELEVEN_CONCURRENCY holds
+        self.tts_pool = ThreadPoolExecutor(max_workers=max(1, TTS_WORKERS))
+        self.reviews = deque()
+        self.reviewing = False
+        self.aborted = False
+        self.topics = []
+        self.project_dir = None
+        self.rows = {}
+        self.started = {}
+        self.approved = {}
+        self.scripts = {}
+        self._build()
+        root.protocol("WM_DELETE_WINDOW", self.close)
+        root.after(POLL_MS, self._poll)
+
+    # ------------------ layout ------------------
+    def _build(self):
+        self.root.title("yt_auto_tts")
+        top = ttk.Frame(self.root, padding=6)
+        top.pack(fill=tk.X)
+        ttk.Label(top, text="Enter topics separated by commas or newlines:").pack(anchor=tk.W)
+        self.topics_box = tk.Text(top, width=80, height=4)
+        self.topics_box.pack(fill=tk.X)
+        self.start_btn = ttk.Button(top, text="Start", command=self.start)
+        self.start_btn.pack(anchor=tk.E, pady=4)
+
+        self.progress = ttk.Progressbar(self.root, mode="determinate")
+        self.progress.pack(fill=tk.X, padx=6)
+
+        self.tree = ttk.Treeview(self.root, columns=("status", "time"), height=8)
+        self.tree.heading("#0", text="Job")
+        self.tree.heading("status", text="Status")
+        self.tree.heading("time", text="Time")
+        self.tree.column("time", width=80, anchor=tk.E)
+        self.tree.pack(fill=tk.X, padx=6, pady=4)
+
+        self.review = ttk.LabelFrame(self.root, text="Review", padding=6)
+        self.review.pack(fill=tk.BOTH, expand=True, padx=6, pady=4)
+        self.status = ttk.Label(self.root, text="Idle", anchor=tk.W)
+        self.status.pack(fill=tk.X, padx=6, pady=(0, 6))
+
+    def _clear_review(self, title: str = "Review"):
+        for child in self.review.winfo_children():
+            child.destroy()
+        self.review.configure(text=title)
+
+    # ------------------ threading ------------------
+    def post(self, fn, *args):
+        """Schedule ``fn(*args)`` on the UI thread (safe from any thread)."""
+        self.events.put((fn, args))
+
+    def _poll(self):
         while True:
             try:
-                r = requests.get(img["url"], headers=headers, timeout=15)
-                r.raise_for_status()
-                break
-            except requests.RequestException as e:
-                print(f"Failed to download {img['url']}: {e}")
-                choice = input("Retry download? [y/N]: ").strip().lower()
-                if choice == "y":
-                    continue
+                fn, args = self.events.get_nowait()
+            except queue.Empty:
                 break
+            # a failing callback must not stop the polling loop
+            try:
+                fn(*args)
             except Exception as e:
-                print(f"Unexpected error downloading {img['url']}: {e}")
-                break
-        if r is None:
-            continue
+                print(f"❌ UI callback {getattr(fn, '__name__', fn)} failed: {e}")
+                traceback.print_exc()
+        self.root.after(POLL_MS, self._poll)
 
-        keep = False
+    def run(self, pool, key, stage: str, fn, *args, then=None):
+        """Run ``fn(*args)`` on *pool* as *stage*, then ``then(result)`` on the UI."""
+        self.stage_start(key, stage)
 
-        def accept():
-            nonlocal keep
-            keep = True
-            win.destroy()
+        def job():
+            try:
+                result = fn(*args)
+            except Exception as e:
+                self.post(self.fail, key, stage, e)
+                return
+            self.post(self._finished, key, stage, then, result)
 
-        def skip():
-            win.destroy()
+        pool.submit(job)
 
-        win = tk.Tk()
-        win.title(f"{topic} ({idx}/{len(images)})")
-        bio = BytesIO(r.content)
+    def _finished(self, key, stage, then, result):
+        if self.aborted:
+            return
+        self.stage_done(key, stage)
+        if then is not None:
+            then(result)
+
+    # ------------------ stages ------------------
+    def _add_row(self, key, label: str, stages):
+        parent = self.tree.insert("", tk.END, text=label, open=True)
+        self.rows[key] = {"": parent}
+        for stage in stages:
+            self.rows[key][stage] = self.tree.insert(parent, tk.END, text=stage,
+                                                     values=("waiting", ""))
+
+    def stage_start(self, key, stage: str, status: str = "running"):
+        self.started[(key, stage)] = time.perf_counter()
+        self.tree.item(self.rows[key][stage], values=(status, ""))
+
+    def stage_status(self, key, stage: str, status: str):
+        item = self.rows[key][stage]
+        self.tree.item(item, values=(status, self.tree.set(item, "time")))
+
+    def stage_done(self, key, stage: str, status: str = "done"):
+        elapsed = time.perf_counter() - self.started.pop((key, stage), time.perf_counter())
+        self.tree.item(self.rows[key][stage], values=(status, f"{elapsed:.1f}s"))
+        self.progress.step(1)
+
+    def fail(self, key, stage: str, error: Exception):
+        print(f"❌ {stage} failed: {error}")
+        self.stage_status(key, stage, "failed")
+        self.abort(f"{stage} failed: {error}")
+
+    def abort(self, reason: str):
+        self.aborted = True
+        self.reviews.clear()
+        self._clear_review()
+        self.status.configure(text=reason)
+        print(reason)
+        self._book_usage()
+
+    def _book_usage(self):
+        """Append the usage so far to the project's ledger (UI thread only)."""
+        if self.project_dir is not None:
+            close_ledger(self.project_dir / "ledger.jsonl")
+
+    # ------------------ pipeline ------------------
+    def start(self):
+        topics = parse_topics(self.topics_box.get("1.0", tk.END))
+        if not topics:
+            messagebox.showwarning("Topics", "No topics provided", parent=self.root)
+            return
         try:
-            pil_img = Image.open(bio)
-        except Exception:
-            print(f"Skipping invalid image: {img['url']}")
-            win.destroy()
-            continue
-        pil_img.thumbnail((500, 500))
-        tk_img = ImageTk.PhotoImage(pil_img)
-        lbl = tk.Label(win, image=tk_img)
-        lbl.image = tk_img
-        lbl.pack()
-        tk.Label(win, text=f"{img['title']}\nLicense: {img['license']}").pack()
-        btn_frame = tk.Frame(win)
-        btn_frame.pack()
-        tk.Button(btn_frame, text="Keep", command=accept).pack(side=tk.LEFT)
-        tk.Button(btn_frame, text="Skip", command=skip).pack(side=tk.LEFT)
-        win.mainloop()
-
-        if keep:
-            ext = os.path.splitext(img["url"].split("?")[0])[1]
-            out_path = dest / f"{idx:02d}{ext}"
-            with open(out_path, "wb") as f:
-                f.write(r.content)
-            saved.append(out_path)
-
-    return saved
-
-
-def main():
-    topics = ask_topics()
-    if not topics:
-        print("No topics provided")
-        return
-
-    basename = f"gui_{uuid.uuid4().hex[:8]}"
-    char_target = calc_target_per_topic(len(topics))
-
-    project_dir = PROJECTS_DIR / basename
-    project_dir.mkdir(parents=True, exist_ok=True)
-
-    mp3_files = []
-    for idx, topic in enumerate(topics, 1):
-        print(f"\n📝 Generating script for: {topic}")
-        text = generate_script(topic, char_target)
-
-        if not show_text(text):
-            print("Script not approved. Exiting.")
+            check_config(gpt=True, tts=True, postprocess=self.postprocess)
+        except ConfigError as e:
+            messagebox.showerror("Configuration", str(e), parent=self.root)
             return
+        self.start_btn.configure(state=tk.DISABLED)
+        self.topics_box.configure(state=tk.DISABLED)
+        self.topics = topics
+        self.basename = f"gui_{uuid.uuid4().hex[:8]}"
+        self.project_dir = PROJECTS_DIR / self.basename
+        self.project_dir.mkdir(parents=True, exist_ok=True)
+        char_target = calc_target_per_topic(len(topics))
+
+        self.progress.configure(maximum=len(topics) * len(STAGES) + 1, value=0)
+        for idx, topic in enumerate(topics, 1):
+            self._add_row(idx, topic, STAGES)
+        self._add_row("final", "Final", ("merge",))
+        self.status.configure(text=f"Generating {len(topics)} script(s) …")
+        self._show_waiting()
+
+        for idx, topic in enumerate(topics, 1):
+            self.run(self.gpt_pool, idx, "script", generate_checked_script, topic, char_target,
+                     then=lambda text, idx=idx: self.enqueue(idx, "script", text))
+
+    def enqueue(self, idx, kind: str, payload):
+        """Queue a review; it is shown as soon as the review pane is free."""
+        if self.aborted:
+            return
+        self.reviews.append((idx, kind, payload))
+        if not self.reviewing:
+            self._next_review()
 
-        save_text(project_dir / f"{slugify(topic)}.md", text)
-
-        chosen = select_images(topic)
-        if chosen:
-            print(f"Saved {len(chosen)} image(s) for {topic}")
-            images_src = IMAGES_DIR / slugify(topic)
-            if images_src.exists():
-                dest = project_dir / "images" / slugify(topic)
-                shutil.copytree(images_src, dest, dirs_exist_ok=True)
-
+    def _next_review(self):
+        if self.aborted:
+            return
+        if not self.reviews:
+            self.reviewing = False
+            self._show_waiting()
+            return
+        self.reviewing = True
+        idx, kind, payload = self.reviews.popleft()
+        {"script": self._review_script,
+         "images": self._review_images,
+         "audio": self._review_audio}[kind](idx, payload)
+
+    def _show_waiting(self):
+        self._clear_review()
+        ttk.Label(self.review, text="Waiting for background jobs …").pack(expand=True)
+
+    def _review_script(self, idx, text: str):
+        topic = self.topics[idx - 1]
+        self._clear_review(f"Approve Script: {topic}")
+        self.stage_start(idx, "review", "waiting for you")
+        st = scrolledtext.ScrolledText(self.review, width=80, height=30)
+        st.insert(tk.END, text)
+        st.pack(fill=tk.BOTH, expand=True)
+
+        def approve():
+            self.stage_done(idx, "review")
+            self._script_approved(idx, st.get("1.0", tk.END).strip())
+            self._next_review()
+
+        def reject():
+            self.stage_status(idx, "review", "rejected")
+            self.abort("Script not approved. Stopped.")
+
+        buttons = ttk.Frame(self.review)
+        buttons.pack()
+        ttk.Button(buttons, text="Approve", command=approve).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Reject", command=reject).pack(side=tk.LEFT)
+
+    def _script_approved(self, idx, text: str):
+        topic = self.topics[idx - 1]
+        save_text(self.project_dir / f"{slugify(topic)}.md", text)
+        self.scripts[idx] = text
+        self.run(self.work_pool, idx, "images", find_images, topic,
+                 then=lambda images: self.enqueue(idx, "images", images))
+        self.run(self.work_pool, idx, "tts", self._tts, idx, text,
+                 then=lambda parts: self._merge_topic(idx, parts))
+
+    def _tts(self, idx, text: str):
+        """Queue the blocks of topic *idx* on the shared TTS pool and wait for them."""
         blocks = split_text_blocks(text)
-        part_files = []
-        for i, block in enumerate(blocks):
-            print(f"TTS {i+1}/{len(blocks)} …")
-            part_files.append(tts_chunk(block, i, f"{basename}_{idx}"))
-        topic_mp3 = merge_parts(part_files, f"{basename}_{idx}", dest_dir=project_dir)
-
-        if not confirm_audio(str(topic_mp3)):
-            print("Audio not approved. Exiting.")
+        futures = _submit_blocks(self.tts_pool, blocks, f"{self.basename}_{idx}")
+        done = itertools.count(1)
+        for f in futures:
+            f.add_done_callback(lambda _f: self.post(
+                self.stage_status, idx, "tts", f"{next(done)}/{len(futures)} blocks"))
+        try:
+            parts = [f.result() for f in futures]
+        except Exception:
+            for f in futures:
+                f.cancel()
+            raise
+        CALIBRATION.save()
+        return parts
+
+    def _merge_topic(self, idx, parts):
+        self.run(self.work_pool, idx, "merge", merge_topic, parts,
+                 f"{self.basename}_{idx}", self.project_dir, self.merge_mode,
+                 self.postprocess, then=lambda path: self._topic_merged(idx, path))
+
+    def _topic_merged(self, idx, path):
+        self._book_usage()
+        self.enqueue(idx, "audio", path)
+
+    def _review_images(self, idx, images: list):
+        topic = self.topics[idx - 1]
+        if not images:
+            self.stage_status(idx, "images", "none found")
+            self._next_review()
             return
-        mp3_files.append(topic_mp3)
-
-    final = merge_parts(mp3_files, basename, dest_dir=project_dir)
+        self.stage_status(idx, "images", "waiting for you")
+        dest = IMAGES_DIR / slugify(topic)
+        dest.mkdir(parents=True, exist_ok=True)
+        previews = Previews(images)
+        downloads = []
+
+        def finish():
+            previews.close()
+            self.stage_status(idx, "images", f"{len(downloads)} kept")
+            self.work_pool.submit(self._stage_images, topic, downloads)
+            self._next_review()
+
+        def show(i: int):
+            if self.aborted:
+                previews.close()
+                return
+            if i >= len(images):
+                finish()
+                return
+            fut = previews.get(i)
+            if not fut.done():
+                self._clear_review(f"{topic} ({i + 1}/{len(images)})")
+                ttk.Label(self.review, text="Loading preview …").pack(expand=True)
+                self.root.after(POLL_MS, show, i)
+                return
+            pil_img = fut.result()
+            if pil_img is None:
+                show(i + 1)
+                return
+
+            img = images[i]
+            self._clear_review(f"{topic} ({i + 1}/{len(images)})")
+            tk_img = ImageTk.PhotoImage(pil_img)
+            lbl = ttk.Label(self.review, image=tk_img)
+            lbl.image = tk_img
+            lbl.pack()
+            ttk.Label(self.review, text=f"{img['title']}\nLicense: {img['license']}").pack()
+
+            def keep():
+                ext = os.path.splitext(img["url"].split("?")[0])[1]
+                out_path = dest / f"{i + 1:02d}{ext}"
+                downloads.append(self.work_pool.submit(_download_full, img, out_path))
+                show(i + 1)
+
+            buttons = ttk.Frame(self.review)
+            buttons.pack()
+            ttk.Button(buttons, text="Keep", command=keep).pack(side=tk.LEFT)
+            ttk.Button(buttons, text="Skip", command=lambda: show(i + 1)).pack(side=tk.LEFT)
+            ttk.Button(buttons, text="Done", command=finish).pack(side=tk.LEFT)
+
+        show(0)
+
+    def _stage_images(self, topic: str, downloads: list):
+        """Wait for the kept downloads and stage them into the project."""
+        saved = 0
+        for fut in downloads:
+            try:
+                fut.result()
+                saved += 1
+            except (requests.RequestException, CircuitOpen) as e:
+                print(f"Failed to download image: {e}")
+        print(f"Saved {saved} image(s) for {topic}")
+        images_src = IMAGES_DIR / slugify(topic)
+        if saved and self.project_dir and images_src.exists():
+            stage_assets(images_src, self.project_dir / "images" / slugify(topic))
+
+    def _review_audio(self, idx, path):
+        topic = self.topics[idx - 1]
+        self._clear_review(f"Approve Audio: {topic}")
+        self.stage_start(idx, "audio", "waiting for you")
+        ttk.Label(self.review, text=str(path)).pack(pady=6)
+
+        def approve():
+            self.stage_done(idx, "audio")
+            self.approved[idx] = path
+            if len(self.approved) == len(self.topics):
+                self._merge_final()
+            self._next_review()
+
+        def reject():
+            self.stage_status(idx, "audio", "rejected")
+            self.abort("Audio not approved. Stopped.")
+
+        buttons = ttk.Frame(self.review)
+        buttons.pack()
+        ttk.Button(buttons, text="Play", command=lambda: open_file(path)).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Approve", command=approve).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Reject", command=reject).pack(side=tk.LEFT)
+        open_file(path)
+
+    def _merge_final(self):
+        files = [self.approved[i] for i in range(1, len(self.topics) + 1)]
+        self.status.configure(text="Merging final audio …")
+        self.run(self.work_pool, "final", "merge", self._merge_and_index, files,
+                 then=self._done)
+
+    def _merge_and_index(self, files):
+        """Merge the topic files and write the chapter index next to the result.
+
+        The topic files are the parts here, so each topic counts as one block
+        and its paragraph times are shared out over the whole topic.
+        """
+        timeline = []
+        final = merge_final(files, self.basename, self.project_dir, self.merge_mode,
+                            timeline=timeline)
+        topics = [(self.topics[i - 1], [self.scripts[i]])
+                  for i in range(1, len(self.topics) + 1)]
+        write_chapter_index(final, topics, timeline)
+        return final
+
+    def _done(self, final):
+        self._book_usage()
+        self.status.configure(text=f"Final audio saved to {final}")
+        messagebox.showinfo("Done", f"Final audio saved to {final}", parent=self.root)
+
+    def test_images(self, topic: str):
+        """Run only the image search and review for *topic*."""
+        self.topics = [topic]
+        self.start_btn.configure(state=tk.DISABLED)
+        self.progress.configure(maximum=1, value=0)
+        self._add_row(1, topic, ("images",))
+        self.run(self.work_pool, 1, "images", find_images, topic,
+                 then=lambda images: self.enqueue(1, "images", images))
+
+    def close(self):
+        self.aborted = True
+        self.gpt_pool.shutdown(wait=False, cancel_futures=True)
+        self.work_pool.shutdown(wait=False, cancel_futures=True)
+        self.tts_pool.shutdown(wait=False, cancel_futures=True)
+        self._book_usage()
+        self.root.destroy()
+
+
+def main(merge_mode: str = MERGE_MODE, test_topic: str | None = None,
+         postprocess: bool = POSTPROCESS):
+    ensure_dirs()
     root = tk.Tk()
-    root.withdraw()
-    messagebox.showinfo("Done", f"Final audio saved to {final}")
-    root.destroy()
+    app = App(root, merge_mode, postprocess)
+    if test_topic:
+        app.test_images(test_topic)
+    root.mainloop()
 
 
 if __name__ == "__main__":
@@ -223,17 +580,25 @@ if __name__ == "__main__":
     ap.add_argument(
         "--test-images",
         action="store_true",
-        help="Only run image approval for --topic and exit",
+        help="Only run image approval for --topic",
     )
     ap.add_argument(
         "--topic",
         default="Sperm Whale vs Colossal Squid",
         help="Topic to search images for in --test-images mode",
     )
+    ap.add_argument(
+        "--merge-mode",
+        choices=MERGE_MODES,
+        default=MERGE_MODE,
+        help="speed: join MP3s without re-encoding, size: WAV topics, one final encode",
+    )
+    ap.add_argument(
+        "--postprocess",
+        action="store_true",
+        default=POSTPROCESS,
+        help="trim silence at chunk edges and normalize loudness (needs numpy)",
+    )
     args = ap.parse_args()
 
-    if args.test_images:
-        chosen = select_images(args.topic)
-        print(f"Saved {len(chosen)} image(s)")
-    else:
-        main()
+    main(args.merge_mode, args.topic if args.test_images else None, args.postprocess)
@@ -0,0 +1,94 @@
+"""Compare merge_parts() with the old ``AudioSegment +=`` implementation.
+
+Synthetic one-minute parts are merged into outputs of 1, 10 and 60 minutes.
+Every run happens in a fresh process so the reported peak RSS belongs to that
+run alone.
+
+    python bench_merge.py [--minutes 1 10 60] [--fmt wav|mp3] [--postprocess]
+
+``--postprocess`` adds a run with silence trimming and loudness
+normalization (needs numpy) to show what it costs over the plain merge.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("ELEVEN_API_KEY", "bench")
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+import auto_tts
+
+PART_MS = 60_000
+FRAME_RATE = 44_100
+
+
+def legacy_merge(files, out_path: Path, fmt: str):
+    """The original quadratic merge, kept here as the baseline."""
+    combined = AudioSegment.empty()
+    pause = AudioSegment.silent(duration=auto_tts.MERGE_PAUSE_MS)
+    for f in files:
+        combined += AudioSegment.from_file(f) + pause
+    combined.export(out_path, format=fmt)
+
+
+def make_parts(directory: Path, count: int, fmt: str):
+    tone = Sine(220, sample_rate=FRAME_RATE).to_audio_segment(duration=PART_MS)
+    src = directory / f"part.{fmt}"
+    tone.export(src, format=fmt)
+    files = []
+    for i in range(count):
+        dst = directory / f"part_{i:03d}.{fmt}"
+        os.link(src, dst)
+        files.append(dst)
+    return files
+
+
+def _run(impl: str, files, out_dir: str, fmt: str, queue):
+    start = time.perf_counter()
+    if impl == "legacy":
+        legacy_merge(files, Path(out_dir) / f"legacy.{fmt}", fmt)
+    else:
+        auto_tts.merge_parts(files, impl, dest_dir=Path(out_dir), fmt=fmt,
+                             postprocess=impl == "post")
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def measure(impl: str, files, out_dir: Path, fmt: str):
+    queue = mp.Queue()
+    proc = mp.Process(target=_run, args=(impl, files, str(out_dir), fmt, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--minutes", type=int, nargs="+", default=[1, 10, 60])
+    ap.add_argument("--fmt", default="wav", choices=["wav", "mp3"],
+                    help="part/output format (mp3 needs ffmpeg)")
+    ap.add_argument("--postprocess", action="store_true",
+                    help="also time the merge with trimming and normalization")
+    args = ap.parse_args()
+    impls = ("legacy", "engine", "post") if args.postprocess else ("legacy", "engine")
+
+    print(f"{'min':>4} {'impl':>7} {'seconds':>9} {'peak MB':>9}")
+    for minutes in args.minutes:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            files = make_parts(tmp, minutes, args.fmt)
+            for impl in impls:
+                seconds, rss_kb = measure(impl, files, tmp, args.fmt)
+                print(f"{minutes:>4} {impl:>7} {seconds:>9.2f} {rss_kb / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
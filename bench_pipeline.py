@@ -0,0 +1,243 @@
+"""End-to-end benchmark of ``--approve`` and ``--topics`` against stub APIs.
+
+OpenAI, ElevenLabs and Wikimedia are replaced by one local HTTP server with a
+configurable latency per request. Each scenario runs ``auto_tts.py`` in a
+fresh process inside a scratch copy of the repo and reads back the
+``metrics.json`` the run writes next to its project (stage durations, bytes,
+retries, cache hits, peak RSS). Merging the stub MP3s needs ffmpeg.
+
+    python bench_pipeline.py [--latency 0.2] [--gpt-seconds 2] [--chars 7000]
+                             [--topics 3] [--throttle-every 5] [--json results.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+HERE = Path(__file__).parent
+CHARS_PER_MIN = 700
+# one silent MPEG-1 Layer III frame: 128 kbit/s, 44.1 kHz, mono, 26.1 ms
+MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0xC0]) + bytes(413)
+MP3_FRAME_SECONDS = 1152 / 44100
+SENTENCE = "Der Fluss trägt Geschichten aus den Bergen bis hinunter ans Meer. "
+
+
+def fake_script(chars: int, seed: int = 0) -> str:
+    """German-looking filler of about *chars* characters in short paragraphs.
+
+    Different *seed* values give different text, so scripts don't share
+    TTS cache entries.
+    """
+    paras, size = [], 0
+    while size < chars:
+        para = f"Kapitel {seed}.{len(paras) + 1}. " + (SENTENCE * 6).strip()
+        paras.append(para)
+        size += len(para) + 2
+    return "\n\n".join(paras)
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    """Chat completions, ElevenLabs streaming TTS and the Commons search API."""
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    gpt_seconds = 0.0
+    script_chars = 7000
+    throttle_every = 0
+    tts_calls = itertools.count(1)
+    scripts = itertools.count(1)
+
+    def _send(self, status: int, body: bytes = b"", ctype: str = "application/json",
+              headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.latency)
+        if self.path.endswith("/chat/completions"):
+            # honour the "~N character" target of the prompt, like a good model
+            asked = re.search(r"~(\d+) character", body["messages"][-1]["content"])
+            chars = int(asked.group(1)) if asked else self.script_chars
+            text = fake_script(chars, next(type(self).scripts))
+            prompt = sum(len(m["content"]) for m in body["messages"]) // 4
+            if body.get("stream"):
+                self._stream_chat(body["model"], text, prompt)
+                return
+            time.sleep(self.gpt_seconds)
+            self._send(200, json.dumps({
+                "id": "bench", "object": "chat.completion", "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": prompt, "completion_tokens": len(text) // 4,
+                          "total_tokens": prompt + len(text) // 4},
+            }).encode())
+        elif "/text-to-speech/" in self.path:
+            n = next(type(self).tts_calls)
+            if self.throttle_every and n % self.throttle_every == 0:
+                self._send(429, headers={"Retry-After": "0"})
+                return
+            seconds = len(body["text"]) * 60 / CHARS_PER_MIN
+            self._send(200, MP3_FRAME * max(1, round(seconds / MP3_FRAME_SECONDS)),
+                       ctype="audio/mpeg")
+        else:
+            self._send(404)
+
+    def _stream_chat(self, model: str, text: str, prompt: int, pieces: int = 50):
+        """Answer as server-sent events, spreading the text over ``gpt_seconds``."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(data: dict):
+            payload = f"data: {json.dumps(data)}\n\n".encode()
+            self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+            self.wfile.flush()
+
+        base = {"id": "bench", "object": "chat.completion.chunk", "created": 0,
+                "model": model}
+        step = -(-len(text) // pieces)
+        for i in range(0, len(text), step):
+            time.sleep(self.gpt_seconds / pieces)
+            event(dict(base, choices=[{"index": 0, "finish_reason": None,
+                                       "delta": {"content": text[i:i + step]}}]))
+        event(dict(base, choices=[], usage={
+            "prompt_tokens": prompt, "completion_tokens": len(text) // 4,
+            "total_tokens": prompt + len(text) // 4}))
+        payload = b"data: [DONE]\n\n"
+        self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n0\r\n\r\n")
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        if query.get("list") == "search":
+            limit = int(query.get("srlimit", 3))
+            data = {"query": {"search": [
+                {"title": f"File:{query['srsearch']} {i}.jpg"} for i in range(limit)
+            ]}}
+        else:
+            data = {"query": {"pages": {
+                str(i): {"title": t, "imageinfo": [{
+                    "url": f"https://example.org/{i}.jpg",
+                    "thumburl": f"https://example.org/thumb/{i}.jpg",
+                    "extmetadata": {"LicenseShortName": {"value": "CC BY-SA 4.0"}},
+                }]}
+                for i, t in enumerate(query.get("titles", "").split("|"))
+            }}}
+        self._send(200, json.dumps(data).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def scratch_copy(root: Path) -> Path:
+    """Copy the script and its prompt into *root* so runs don't touch the repo."""
+    shutil.copy2(HERE / "auto_tts.py", root / "auto_tts.py")
+    shutil.copytree(HERE / "prompts", root / "prompts")
+    return root
+
+
+def run_cli(root: Path, env: dict, *args):
+    proc = subprocess.run([sys.executable, "auto_tts.py", *args], cwd=root, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.exit(f"auto_tts.py {' '.join(args)} failed:\n{proc.stdout}{proc.stderr}")
+
+
+def bench_images(base: str, root: Path, chars: int) -> dict:
+    """Image search for one script, in-process against the stub Commons API."""
+    os.environ["WIKIMEDIA_API"] = f"{base}/w/api.php"
+    sys.path.insert(0, str(root))
+    import auto_tts
+
+    auto_tts.SEARCH_CACHE = auto_tts.SearchCache(root / "search_cache.json", 3600)
+    auto_tts.METRICS.reset()
+    auto_tts.search_images_for_script(fake_script(chars), per_query=2)
+    return auto_tts.METRICS.snapshot()
+
+
+def report(name: str, m: dict):
+    stages = ", ".join(f"{k} {v['seconds']:.2f}s/{v['calls']}"
+                       for k, v in sorted(m["stages"].items()))
+    counters = ", ".join(f"{k}={v}" for k, v in sorted(m["counters"].items()))
+    print(f"{name:<14} {m['wall_seconds']:>7.2f}s  RSS {m['peak_rss_mb']} MB "
+          f"(+{m['peak_rss_children_mb']} MB ffmpeg)")
+    print(f"{'':<14} {stages}")
+    print(f"{'':<14} {counters}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--latency", type=float, default=0.2,
+                    help="seconds every stub request takes")
+    ap.add_argument("--gpt-seconds", type=float, default=2.0,
+                    help="seconds the stub takes to write one script")
+    ap.add_argument("--chars", type=int, default=7000,
+                    help="characters of the --approve draft (and of scripts "
+                         "whose prompt names no target)")
+    ap.add_argument("--topics", type=int, default=3)
+    ap.add_argument("--throttle-every", type=int, default=0,
+                    help="answer every n-th TTS request with 429")
+    ap.add_argument("--json", type=Path, help="also write all metrics here")
+    args = ap.parse_args()
+
+    StubAPI.latency = args.latency
+    StubAPI.gpt_seconds = args.gpt_seconds
+    StubAPI.script_chars = args.chars
+    StubAPI.throttle_every = args.throttle_every
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    env = dict(os.environ, OPENAI_API_KEY="bench", ELEVEN_API_KEY="bench",
+               OPENAI_BASE_URL=f"{base}/v1", ELEVEN_API_BASE=base,
+               WIKIMEDIA_API=f"{base}/w/api.php", TTS_BACKEND="elevenlabs")
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = scratch_copy(Path(tmp))
+            (root / "drafts").mkdir()
+            (root / "drafts" / "bench_topic.md").write_text(fake_script(args.chars),
+                                                           encoding="utf-8")
+            topics = ",".join(f"Thema {i}" for i in range(1, args.topics + 1))
+            projects = root / "projects"
+
+            for name, cli, project in (
+                ("approve", ["--approve", "bench_topic.md"], "topic"),
+                ("approve-warm", ["--approve", "bench_topic.md"], "topic"),
+                ("topics", ["--topics", topics, "--basename", "bench"], "bench"),
+                ("topics-stream", ["--topics", topics, "--basename", "bench-stream",
+                                   "--stream"], "bench-stream"),
+            ):
+                run_cli(root, env, *cli)
+                results[name] = json.loads(
+                    (projects / project / "metrics.json").read_text(encoding="utf-8"))
+            results["images"] = bench_images(base, root, args.chars)
+    finally:
+        server.shutdown()
+
+    for name, m in results.items():
+        report(name, m)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
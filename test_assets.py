@@ -0,0 +1,108 @@
+import os
+import shutil
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import pytest
+
+import auto_tts
+
+
+@pytest.fixture
+def reflinks(monkeypatch):
+    """Pretend the filesystem can reflink (the copy stands in for a clone)."""
+    monkeypatch.setattr(auto_tts, "_reflink", shutil.copy2)
+
+
+@pytest.fixture
+def no_reflinks(monkeypatch):
+    def unsupported(src, dest):
+        raise OSError("reflink not supported")
+
+    monkeypatch.setattr(auto_tts, "_reflink", unsupported)
+
+
+def test_stage_assets_stores_shared_images_once(tmp_path, reflinks):
+    store = auto_tts.AssetStore(tmp_path / "assets")
+    kraken, squid = tmp_path / "images" / "kraken", tmp_path / "images" / "squid"
+    kraken.mkdir(parents=True)
+    squid.mkdir(parents=True)
+    (kraken / "01.jpg").write_bytes(b"same wikimedia file")
+    (squid / "03.jpg").write_bytes(b"same wikimedia file")
+    (squid / "04.jpg").write_bytes(b"other file")
+
+    first = auto_tts.stage_assets(kraken, tmp_path / "p1" / "images", store)
+    second = auto_tts.stage_assets(squid, tmp_path / "p2" / "images", store)
+
+    assert first == {"reflink": 1, "copy": 0, "skipped": 0}
+    assert second == {"reflink": 2, "copy": 0, "skipped": 0}
+    assert len(list(store.directory.glob("*.jpg"))) == 2
+    # sources and copies are files of their own
+    assert (kraken / "01.jpg").stat().st_nlink == 1
+    assert (tmp_path / "p2" / "images" / "03.jpg").stat().st_nlink == 1
+
+
+def test_without_reflinks_projects_are_copied_from_the_source(tmp_path, no_reflinks):
+    store = auto_tts.AssetStore(tmp_path / "assets")
+    src = tmp_path / "images" / "kraken"
+    src.mkdir(parents=True)
+    (src / "01.jpg").write_bytes(os.urandom(100_000))
+
+    for n in range(3):
+        assert auto_tts.stage_assets(src, tmp_path / f"p{n}", store)["copy"] == 1
+
+    # the source and one copy per project, no extra blob
+    files = [p for p in tmp_path.rglob("*") if p.is_file()]
+    assert sum(p.stat().st_size for p in files) == 4 * 100_000
+    assert not store.directory.exists() or not any(store.directory.iterdir())
+
+
+def test_replacing_a_source_changes_nothing_else(tmp_path, reflinks):
+    store = auto_tts.AssetStore(tmp_path / "assets")
+    kraken, squid = tmp_path / "images" / "kraken", tmp_path / "images" / "squid"
+    kraken.mkdir(parents=True)
+    squid.mkdir(parents=True)
+    (kraken / "01.jpg").write_bytes(b"shared")
+    (squid / "03.jpg").write_bytes(b"shared")
+    auto_tts.stage_assets(kraken, tmp_path / "p1", store)
+    auto_tts.stage_assets(squid, tmp_path / "p2", store)
+
+    with open(kraken / "01.jpg", "wb") as f:  # rewritten in place
+        f.write(b"re-downloaded")
+    with open(tmp_path / "p2" / "03.jpg", "wb") as f:  # edited by hand
+        f.write(b"edited")
+
+    assert (squid / "03.jpg").read_bytes() == b"shared"
+    assert (tmp_path / "p1" / "01.jpg").read_bytes() == b"shared"
+    assert [b.read_bytes() for b in store.directory.glob("*.jpg")] == [b"shared"]
+
+
+def test_stage_assets_is_incremental(tmp_path, reflinks):
+    store = auto_tts.AssetStore(tmp_path / "assets")
+    src, dest = tmp_path / "images", tmp_path / "project"
+    src.mkdir()
+    (src / "01.jpg").write_bytes(b"one")
+    (src / "02.jpg").write_bytes(b"two")
+    (src / "05.jpg.part").write_bytes(b"still downloading")
+    auto_tts.stage_assets(src, dest, store)
+
+    (src / "02.jpg").write_bytes(b"two, re-downloaded")
+    (dest / "03.jpg").write_bytes(b"added by hand")
+
+    counts = auto_tts.stage_assets(src, dest, store)
+
+    assert counts == {"reflink": 1, "copy": 0, "skipped": 1}
+    assert (dest / "02.jpg").read_bytes() == b"two, re-downloaded"
+    assert (dest / "03.jpg").exists() and not (dest / "05.jpg.part").exists()
+    # the blob of the old 02.jpg is no longer used anywhere
+    assert store.prune() == 1
+
+
+def test_clone_file_falls_back_to_copy(tmp_path, no_reflinks):
+    src = tmp_path / "a.jpg"
+    src.write_bytes(b"data")
+
+    assert auto_tts.clone_file(src, tmp_path / "b.jpg") == "copy"
+    assert (tmp_path / "b.jpg").read_bytes() == b"data"
+    assert auto_tts._up_to_date(src, tmp_path / "b.jpg")
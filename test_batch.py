@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import auto_tts
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    for name in ("DRAFT_DIR", "APPROVED_DIR", "PROJECTS_DIR", "PARTS_DIR", "IMAGES_DIR"):
+        path = tmp_path / name.lower()
+        path.mkdir()
+        monkeypatch.setattr(auto_tts, name, path)
+    return tmp_path
+
+
+def test_load_jobs_orders_by_priority(dirs, tmp_path):
+    jobs = tmp_path / "jobs.txt"
+    jobs.write_text("a_one.md\ntopic: Sea Bishop | 5\n# comment\nb_two.md | 2\n"
+                    "x.md | high\ntopic: C# history | 1\n")
+    assert auto_tts.load_jobs(str(jobs)) == [
+        {"priority": 5, "topic": "Sea Bishop"},
+        {"priority": 2, "draft": "b_two.md"},
+        {"priority": 1, "topic": "C# history"},
+        {"priority": 0, "draft": "a_one.md"},
+    ]
+
+
+def test_draft_lock_claims_once_and_takes_over_stale_locks(dirs):
+    draft = auto_tts.DRAFT_DIR / "x_topic.md"
+    draft.write_text("text")
+    first, second = auto_tts.DraftLock(draft), auto_tts.DraftLock(draft, stale=60)
+    assert first.acquire()
+    assert not second.acquire()
+
+    old = time.time() - 120
+    os.utime(first.path, (old, old))
+    assert second.acquire()
+    assert json.loads(second.path.read_text())["pid"] == os.getpid()
+
+    first.touch()  # the lock was taken over: leave it alone
+    first.release()
+    assert second.owned() and second.path.exists()
+
+    second.release({"output": "x.mp3"})
+    assert second.is_done() and not second.path.exists()
+    os.utime(draft, (time.time() + 5, time.time() + 5))  # edited after it was done
+    assert not second.is_done()
+
+
+def test_run_batch_shares_tts_limit_and_reports(dirs, monkeypatch):
+    for name in ("a_first", "b_second", "c_third", "d_taken"):
+        (auto_tts.DRAFT_DIR / f"{name}.md").write_text("eins\n\nzwei\n\ndrei")
+    auto_tts.DraftLock(auto_tts.DRAFT_DIR / "d_taken.md").acquire()
+
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def tts(text, idx, basename, use_cache=True):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        path = auto_tts.PARTS_DIR / f"{basename}_{idx:02d}.wav"
+        path.write_text(text)
+        return path
+
+    def merge(files, name, dest_dir, timeline=None, **kwargs):
+        timeline.extend((i, i + 1) for i in range(len(files)))
+        out = dest_dir / f"{name}.mp3"
+        out.write_text("|".join(f.read_text() for f in files))
+        return out
+
+    monkeypatch.setattr(auto_tts, "tts_chunk", tts)
+    monkeypatch.setattr(auto_tts, "merge_final", merge)
+    monkeypatch.setattr(auto_tts, "generate_checked_script", lambda topic, target: "neu")
+
+    jobs = auto_tts.load_jobs(None) + [{"topic": "Fresh", "priority": 0}]
+    reports = auto_tts.run_batch(jobs, parallel=3, workers=2, max_chunk=5)
+
+    assert [r["status"] for r in reports] == ["done", "done", "done", "claimed elsewhere", "done"]
+    assert peak[0] == 2
+    assert (auto_tts.PROJECTS_DIR / "first" / "first.mp3").read_text() == "eins|zwei|drei"
+    assert (auto_tts.PROJECTS_DIR / "fresh" / "fresh.mp3").read_text() == "neu"
+    assert not list(auto_tts.DRAFT_DIR.glob("*_first.md.lock"))
+
+    again = auto_tts.run_batch(auto_tts.load_jobs(None), workers=2)
+    assert [r["status"] for r in again][:3] == ["already done"] * 3
+
+
+def test_run_batch_releases_claims_when_a_job_exits(dirs, monkeypatch):
+    for name in ("a_first", "b_second"):
+        (auto_tts.DRAFT_DIR / f"{name}.md").write_text("eins")
+
+    def approve(draft, pool=None, **options):
+        if draft.name == "a_first.md":
+            raise SystemExit("ELEVEN_API_KEY fehlt")
+        return auto_tts.PROJECTS_DIR / "second.mp3"
+
+    monkeypatch.setattr(auto_tts, "approve_draft", approve)
+
+    reports = auto_tts.run_batch(auto_tts.load_jobs(None), parallel=2)
+
+    assert [(r["status"], r.get("error")) for r in reports] == [
+        ("failed", "ELEVEN_API_KEY fehlt"), ("done", None)]
+    assert not list(auto_tts.DRAFT_DIR.glob("*.lock"))
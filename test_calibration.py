@@ -0,0 +1,85 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import auto_tts
+
+# silent MPEG-1 Layer III frame, 128 kbit/s, 44.1 kHz, mono
+FRAME = bytes([0xFF, 0xFB, 0x90, 0xC0]) + bytes(413)
+
+
+def test_audio_duration_reads_mp3_frames_and_wav(tmp_path, monkeypatch):
+    mp3 = tmp_path / "a.mp3"
+    mp3.write_bytes(b"ID3\x03\x00\x00\x00\x00\x00\x05" + b"x" * 5 + FRAME * 100 + b"TAG")
+    assert auto_tts.audio_duration(mp3) == pytest.approx(100 * 1152 / 44100)
+
+    # the LAME header frame (Info after 17 bytes of mono side info) isn't audio
+    lame = tmp_path / "lame.mp3"
+    lame.write_bytes(FRAME[:21] + b"Info" + FRAME[25:] + FRAME * 10)
+    assert auto_tts.audio_duration(lame) == pytest.approx(10 * 1152 / 44100)
+
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    wav = auto_tts.tts_chunk("x" * 700, 0, "cal", backend="fake")
+    assert auto_tts.audio_duration(wav) == pytest.approx(60)
+
+
+def test_calibration_learns_rate_and_sizes_topics(tmp_path, monkeypatch):
+    cal = auto_tts.Calibration(tmp_path / "calibration.json", window=600, min_seconds=60)
+    monkeypatch.setattr(auto_tts, "CALIBRATION", cal)
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    key = auto_tts.voice_key("fake")
+
+    assert cal.chars_per_min(key) == auto_tts.CHARS_PER_MIN
+    auto_tts.tts_chunk("x" * 700, 0, "cal", backend="fake")
+    assert cal.chars_per_min(key) == pytest.approx(700)
+
+    # a slower voice takes over as the window slides
+    for _ in range(20):
+        cal.record(key, 500, 60)
+    assert cal.chars_per_min(key) == pytest.approx(500, rel=0.05)
+
+    cal.save()
+    reloaded = auto_tts.Calibration(tmp_path / "calibration.json", min_seconds=60)
+    monkeypatch.setattr(auto_tts, "CALIBRATION", reloaded)
+    monkeypatch.setattr(auto_tts, "TTS_BACKEND", "fake")
+    target = auto_tts.calc_target_per_topic(3, pause_ms=0)
+    assert target == pytest.approx(reloaded.chars_per_min(key) * 60 / 3, abs=1)
+    assert auto_tts.calc_target_per_topic(3, chars_per_min=700, pause_ms=0) == 14000
+
+
+class ScriptedClient:
+    """Returns the scripted answers in order and records the requested targets."""
+
+    def __init__(self, *texts):
+        self.texts = list(texts)
+        self.asked = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.asked.append(messages[-1]["content"])
+        message = SimpleNamespace(content=self.texts.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def test_short_script_is_generated_again_with_corrected_target(monkeypatch):
+    monkeypatch.setattr(auto_tts, "load_prompt", lambda: ("system", "{topic} {char_target}"))
+    client = ScriptedClient("a" * 500, "b" * 980)
+
+    text = auto_tts.generate_checked_script("T", 1000, client)
+    assert text == "b" * 980
+    assert client.asked == ["T 1000", "T 2000"]
+
+
+def test_long_script_is_trimmed_at_a_boundary(monkeypatch):
+    monkeypatch.setattr(auto_tts, "load_prompt", lambda: ("system", "{topic} {char_target}"))
+    monkeypatch.setattr(auto_tts, "LENGTH_RETRIES", 0)
+    para = "Ein Satz. " * 10
+    client = ScriptedClient("\n\n".join([para.strip()] * 20))
+
+    text = auto_tts.generate_checked_script("T", 1000, client)
+    assert len(text) <= 1150
+    assert text.endswith(".") and len(text) > 1000
@@ -0,0 +1,50 @@
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import pytest
+from pydub.generators import Sine
+
+import auto_tts
+
+
+def test_merge_parts_reports_part_spans(tmp_path):
+    files = []
+    for i, ms in enumerate((400, 250)):
+        files.append(tmp_path / f"part_{i}.wav")
+        Sine(440).to_audio_segment(duration=ms).export(files[-1], format="wav")
+
+    timeline = []
+    auto_tts.merge_parts(files, "timed", dest_dir=tmp_path, fmt="wav",
+                         pauses=[100, 0], timeline=timeline)
+
+    assert timeline == [pytest.approx((0.0, 0.4)), pytest.approx((0.5, 0.75))]
+
+
+def test_write_chapter_index_maps_topics_blocks_and_paragraphs(tmp_path):
+    topics = [
+        ("Kraken", ["Erster Absatz. Noch ein Satz.\n\nZweiter Absatz.", "Dritter."]),
+        ("Riesenkalmar", ["Ganz allein."]),
+    ]
+    timeline = [(0.0, 60.0), (60.35, 70.0), (3671.0, 3680.5)]
+    audio = tmp_path / "hour.mp3"
+
+    index = json.loads(auto_tts.write_chapter_index(audio, topics, timeline).read_text())
+
+    kraken, squid = index["topics"]
+    assert (kraken["start"], kraken["end"], squid["start"]) == (0.0, 70.0, 3671.0)
+    first, second = kraken["blocks"][0]["paragraphs"]
+    # 29 and 15 characters share the 60 s of the first block
+    assert first["end"] == second["start"] == pytest.approx(60 * 29 / 44, abs=0.001)
+    assert (tmp_path / "hour.chapters.txt").read_text() == "0:00 Kraken\n1:01:11 Riesenkalmar\n"
+
+    srt = (tmp_path / "hour.srt").read_text().split("\n\n")
+    assert srt[0] == "1\n00:00:00,000 --> 00:00:19,772\nErster Absatz."
+    assert srt[-1].strip() == "5\n01:01:11,000 --> 01:01:20,500\nGanz allein."
+
+
+def test_chapter_index_rejects_mismatched_timeline():
+    with pytest.raises(ValueError):
+        auto_tts.chapter_index([("Kraken", ["a", "b"])], [(0.0, 1.0)])
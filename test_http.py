@@ -0,0 +1,134 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import auto_tts
+
+
+class Flaky(BaseHTTPRequestHandler):
+    """Answers 503 (Retry-After: 0) and then 429 before it finally succeeds."""
+
+    protocol_version = "HTTP/1.1"
+    answers = []
+
+    def do_GET(self):
+        status = type(self).answers.pop(0) if type(self).answers else 200
+        self.send_response(status)
+        if status != 200:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(auto_tts, "_breakers", {})
+    monkeypatch.setattr(auto_tts, "_sessions", {})
+
+
+def test_request_retries_transient_statuses(monkeypatch):
+    Flaky.answers = [503, 429]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Flaky)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        r = auto_tts.request("test", "GET", f"http://127.0.0.1:{server.server_port}/")
+    finally:
+        server.shutdown()
+    assert (r.status_code, r.text) == (200, "ok")
+    assert auto_tts.circuit_breaker(r.url).failures == 0
+
+
+def test_breaker_fails_fast_once_a_host_is_down(monkeypatch):
+    monkeypatch.setattr(auto_tts, "HTTP_MAX_DELAY", 0.01)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        url = f"http://127.0.0.1:{s.getsockname()[1]}/"  # nothing listens here
+
+    with pytest.raises(requests.ConnectionError):
+        auto_tts.request("test", "GET", url, retries=auto_tts.BREAKER_FAILURES - 1)
+    started = time.perf_counter()
+    with pytest.raises(auto_tts.CircuitOpen):
+        auto_tts.request("test", "GET", url)
+    assert time.perf_counter() - started < 0.05
+
+    breaker = auto_tts.circuit_breaker(url)
+    breaker.opened -= breaker.cooldown  # cooldown over: one probe goes out
+    with pytest.raises(requests.ConnectionError):
+        auto_tts.request("test", "GET", url, retries=0)
+    with pytest.raises(auto_tts.CircuitOpen):
+        auto_tts.request("test", "GET", url, retries=0)
+
+
+def test_retry_after_date_and_jitter():
+    class Response:
+        headers = {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+
+    assert auto_tts._retry_delay(Response(), 0, 1.0) == 0.0
+    delays = {auto_tts._retry_delay(None, 3, 1.0) for _ in range(20)}
+    assert all(4.0 <= d <= 8.0 for d in delays) and len(delays) > 1
+
+
+def test_identical_blocks_are_rendered_once(tmp_path, monkeypatch):
+    calls = []
+
+    def synth(text, dest, idx, retries, backoff):
+        calls.append(text)
+        time.sleep(0.05)
+        dest.write_bytes(b"ID3" + bytes(512))
+
+    monkeypatch.setattr(auto_tts, "_SYNTHS", {"elevenlabs": (synth, ".mp3")})
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    monkeypatch.setattr(auto_tts, "TTS_CACHE", auto_tts.TTSCache(tmp_path / "cache", 1 << 20))
+
+    with ThreadPoolExecutor(4) as pool:
+        files = list(pool.map(lambda i: auto_tts.tts_chunk("Refrain.", i, "dup"), range(4)))
+    assert calls == ["Refrain."]
+    assert {f.read_bytes() for f in files} == {b"ID3" + bytes(512)}
+
+
+def test_only_connection_errors_and_5xx_trip_the_gpt_breaker():
+    import openai
+
+    def api_error(cls, status=None):
+        # skip the constructors, they want a real HTTP response
+        e = cls.__new__(cls)
+        Exception.__init__(e, cls.__name__)
+        if status is not None:
+            e.status_code = status
+        return e
+
+    errors = [
+        api_error(openai.BadRequestError, 400),
+        ValueError("bug on our side"),
+        api_error(openai.InternalServerError, 503),
+        api_error(openai.APITimeoutError),
+    ]
+
+    class Client:
+        base_url = "https://api.openai.com/v1"
+
+        class chat:
+            class completions:
+                @staticmethod
+                def create(**kwargs):
+                    raise errors.pop(0)
+
+    failures = []
+    for _ in range(4):
+        with pytest.raises(Exception):
+            auto_tts._create_completion(Client, "Kraken", 1000)
+        failures.append(auto_tts.circuit_breaker(Client.base_url).failures)
+    assert failures == [0, 0, 1, 2]
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import pytest
+
+import auto_tts
+
+
+class StubImages(BaseHTTPRequestHandler):
+    """Fake Wikimedia and Unsplash search APIs with a fixed latency.
+
+    Wikimedia finds one file per query word (so queries overlap) and
+    nothing at all for queries starting with "empty".
+    """
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.1
+    lock = threading.Lock()
+    active = {"wikimedia": 0, "unsplash": 0}
+    peak = {"wikimedia": 0, "unsplash": 0}
+    ports = set()
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        provider = "unsplash" if url.path.startswith("/search") else "wikimedia"
+        cls = type(self)
+        with cls.lock:
+            cls.active[provider] += 1
+            cls.peak[provider] = max(cls.peak[provider], cls.active[provider])
+            cls.ports.add(self.client_address[1])
+            cls.requests.append(self.path)
+        try:
+            time.sleep(cls.latency)
+            if provider == "wikimedia" and "srsearch" in query:
+                q = query["srsearch"][0]
+                words = [] if q.startswith("empty") else q.split()
+                hits = [{"title": f"File:{w}.jpg"} for w in words[: int(query["srlimit"][0])]]
+                body = {"query": {"search": hits}}
+            elif provider == "wikimedia":
+                assert query["iiextmetadatafilter"] == ["LicenseShortName"]
+                width = query["iiurlwidth"][0]
+                pages = {
+                    str(i): {
+                        "title": title,
+                        "imageinfo": [{
+                            "url": "https://upload.example/" + title[5:],
+                            "thumburl": f"https://upload.example/thumb/{width}px-{title[5:]}",
+                            "extmetadata": {"LicenseShortName": {"value": "CC BY-SA 4.0"}},
+                        }],
+                    }
+                    for i, title in enumerate(query["titles"][0].split("|"))
+                }
+                body = {"query": {"pages": pages}}
+            else:
+                q = query["query"][0]
+                body = {"results": [{"description": q, "urls": {"regular": f"https://unsplash.example/{q}"}}]}
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        finally:
+            with cls.lock:
+                cls.active[provider] -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubImages)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(auto_tts, "WIKIMEDIA_API", f"{base}/w/api.php")
+    monkeypatch.setattr(auto_tts, "UNSPLASH_API", f"{base}/search/photos")
+    monkeypatch.setattr(auto_tts, "_sessions", {})
+    monkeypatch.setattr(auto_tts, "SEARCH_CACHE",
+                        auto_tts.SearchCache(tmp_path / "search.json", 3600))
+    monkeypatch.setenv("UNSPLASH_ACCESS_KEY", "key")
+    StubImages.peak = {"wikimedia": 0, "unsplash": 0}
+    StubImages.ports = set()
+    StubImages.requests = []
+    yield StubImages
+    server.shutdown()
+
+
+def test_wikimedia_queries_run_concurrently_and_dedupe(stub):
+    started = time.perf_counter()
+    images = auto_tts.search_wikimedia_images(
+        ["sea bishop", "bishop fish", "sea monster", "monk fish", "merman"], limit=10
+    )
+    elapsed = time.perf_counter() - started
+
+    assert [img["url"].rsplit("/", 1)[1] for img in images] == [
+        "sea.jpg", "bishop.jpg", "fish.jpg", "monster.jpg", "monk.jpg", "merman.jpg",
+    ]
+    assert stub.peak["wikimedia"] == auto_tts.IMAGE_WORKERS["wikimedia"]
+    assert elapsed < 5 * stub.latency
+    # five searches plus a single batched imageinfo lookup
+    assert len(stub.requests) == 6
+    assert sum("titles=" in path for path in stub.requests) == 1
+    assert images[0]["thumb"] == "https://upload.example/thumb/500px-sea.jpg"
+
+
+def test_wikimedia_results_are_cached_on_disk(stub, tmp_path):
+    first = auto_tts.search_wikimedia_images(["sea bishop", "bishop fish"], limit=5)
+    sent = len(stub.requests)
+
+    # a fresh cache object reads the file written by the first search
+    auto_tts.SEARCH_CACHE = auto_tts.SearchCache(tmp_path / "search.json", 3600)
+    again = auto_tts.search_wikimedia_images(["sea bishop", "bishop fish"], limit=5)
+
+    assert again == first
+    assert len(stub.requests) == sent
+
+    auto_tts.SEARCH_CACHE = auto_tts.SearchCache(tmp_path / "search.json", 0)
+    auto_tts.search_wikimedia_images(["sea bishop"], limit=5)
+    assert len(stub.requests) > sent
+
+
+def test_script_search_falls_back_to_unsplash_per_paragraph(stub):
+    text = "Sea bishop sighted\n\nempty harbour at night\n\nBishop returns"
+    images = auto_tts.search_images_for_script(text, per_query=1)
+
+    assert [img["url"] for img in images] == [
+        "https://upload.example/Sea.jpg",
+        "https://unsplash.example/empty harbour at night",
+        "https://upload.example/Bishop.jpg",
+    ]
+    assert stub.peak["unsplash"] <= auto_tts.IMAGE_WORKERS["unsplash"]
+    # connections are reused by the pooled sessions
+    assert len(stub.ports) <= sum(auto_tts.IMAGE_WORKERS.values())
@@ -0,0 +1,59 @@
+import os
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+# cumulative import time budget for `import auto_tts`, in microseconds
+IMPORT_BUDGET_US = 150_000
+HEAVY = ("openai", "requests", "pydub", "dotenv")
+
+
+def import_times(tmp_path):
+    """Import a copy of auto_tts in a fresh interpreter with -X importtime."""
+    shutil.copy(Path(__file__).parent / "auto_tts.py", tmp_path)
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("OPENAI_API_KEY", "ELEVEN_API_KEY")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import auto_tts"],
+        cwd=tmp_path, env=env, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    times = {}
+    for line in proc.stderr.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)", line)
+        if m:
+            times[m.group(3)] = int(m.group(1))
+    return times
+
+
+def test_import_is_cheap_and_side_effect_free(tmp_path):
+    times = import_times(tmp_path)
+
+    assert not [m for m in times if m.split(".")[0] in HEAVY]
+    assert times["auto_tts"] < IMPORT_BUDGET_US, f"{times['auto_tts']} us"
+    # no work directories created, no exit without API keys
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name != "__pycache__") == ["auto_tts.py"]
+
+
+def test_missing_keys_raise_config_errors_that_reach_the_caller(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pytest
+
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    os.environ.setdefault("ELEVEN_API_KEY", "test")
+    import auto_tts
+
+    monkeypatch.setattr(auto_tts, "OPENAI_KEY", None)
+    monkeypatch.setattr(auto_tts, "ELEVEN_KEY", None)
+    monkeypatch.setattr(auto_tts, "_client", None)
+
+    with pytest.raises(auto_tts.ConfigError, match="OPENAI_API_KEY"):
+        auto_tts.check_config(gpt=True)
+    auto_tts.check_config(tts=True, backend="fake")
+    # not a SystemExit, so a worker's failure shows up in its future
+    with ThreadPoolExecutor(1) as pool:
+        with pytest.raises(auto_tts.ConfigError, match="ELEVEN_API_KEY"):
+            pool.submit(auto_tts._synth_elevenlabs, "x", Path("x.mp3"), 0, 0, 0).result()
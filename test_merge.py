@@ -0,0 +1,87 @@
+import os
+import shutil
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+import auto_tts
+
+
+def make_parts(tmp_path, durations):
+    files = []
+    for i, ms in enumerate(durations):
+        path = tmp_path / f"part_{i}.wav"
+        Sine(440 + 110 * i).to_audio_segment(duration=ms).export(path, format="wav")
+        files.append(path)
+    return files
+
+
+def test_merge_parts_streams_parts_with_pauses(tmp_path):
+    files = make_parts(tmp_path, [400, 250, 1000])
+    out = auto_tts.merge_parts(files, "merged", dest_dir=tmp_path / "out", fmt="wav")
+
+    merged = AudioSegment.from_file(out)
+    assert out.name == "merged.wav"
+    assert len(merged) == 400 + 250 + 1000 + 3 * auto_tts.MERGE_PAUSE_MS
+    # the pause after the first part is silent, the second part is not
+    assert merged[400:400 + auto_tts.MERGE_PAUSE_MS].rms == 0
+    assert merged[750 + 50:750 + 200].rms > 0
+
+
+def test_merge_topic_size_mode_keeps_lossless_intermediate(tmp_path):
+    files = make_parts(tmp_path, [300, 300])
+    out = auto_tts.merge_topic(files, "topic_1", dest_dir=tmp_path / "out", mode="size")
+
+    assert out.suffix == ".wav"
+    assert len(AudioSegment.from_file(out)) == 600 + 2 * auto_tts.MERGE_PAUSE_MS
+
+
+def test_merge_parts_takes_pause_per_part(tmp_path):
+    files = make_parts(tmp_path, [300, 300, 300])
+    out = auto_tts.merge_parts(files, "paused", dest_dir=tmp_path / "out", fmt="wav",
+                               pauses=[100, 1000, 0])
+    assert len(AudioSegment.from_file(out)) == 900 + 1100
+
+
+def test_postprocess_trims_silence_and_evens_out_loudness(tmp_path):
+    pytest.importorskip("numpy")
+    silence = AudioSegment.silent(duration=500, frame_rate=44100)
+    files = []
+    for i, gain in enumerate((-20, -6)):
+        tone = Sine(440).to_audio_segment(duration=1000).apply_gain(gain)
+        path = tmp_path / f"raw_{i}.wav"
+        (silence + tone + silence).export(path, format="wav")
+        files.append(path)
+
+    out = auto_tts.merge_parts(files, "clean", dest_dir=tmp_path / "out", fmt="wav",
+                               pause_ms=200, postprocess=True)
+    merged = AudioSegment.from_file(out)
+    part = 1000 + 2 * auto_tts.TRIM_KEEP_MS
+    assert len(merged) == pytest.approx(2 * (part + 200), abs=2)
+
+    first, second = merged[:part], merged[part + 200:2 * part + 200]
+    assert first.dBFS == pytest.approx(second.dBFS, abs=0.5)
+    assert merged[part + 20:part + 180].rms == 0
+
+
+@pytest.mark.skipif(not (shutil.which("ffmpeg") and shutil.which("ffprobe")),
+                    reason="needs ffmpeg and ffprobe")
+def test_merge_topics_renders_topics_in_processes(tmp_path):
+    files = make_parts(tmp_path, [300, 300, 500])
+    timeline = []
+    out = auto_tts.merge_topics([files[:2], [], files[2:]], "hour", dest_dir=tmp_path / "out",
+                                mode="size", pause_ms=100, topic_pause_ms=700,
+                                processes=2, timeline=timeline)
+
+    assert out.name == "hour.mp3"
+    assert [p.name for p in out.parent.iterdir()] == ["hour.mp3"]
+    # 300 + 100 + 300 | 700 | 500 + 100, plus encoder padding per topic
+    assert len(AudioSegment.from_file(out)) == pytest.approx(2000, abs=150)
+    starts = [start for start, _ in timeline]
+    assert starts[:2] == pytest.approx([0.0, 0.4], abs=0.01)
+    # the second topic starts after the first topic's MP3, padding included
+    assert starts[2] == pytest.approx(1.4, abs=0.15)
@@ -0,0 +1,26 @@
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import auto_tts
+
+
+def test_metrics_record_stages_and_counters(tmp_path, monkeypatch):
+    metrics = auto_tts.Metrics()
+    monkeypatch.setattr(auto_tts, "METRICS", metrics)
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+
+    blocks = auto_tts.split_text_blocks("eins\n\nzwei\n\ndrei", max_chars=5)
+    files = [auto_tts.tts_chunk(b, i, "m", backend="fake") for i, b in enumerate(blocks)]
+    auto_tts.merge_parts(files, "out", dest_dir=tmp_path, fmt="wav")
+
+    data = json.loads(metrics.write(tmp_path / "metrics.json").read_text())
+    assert data["stages"]["split"]["calls"] == 1
+    assert data["stages"]["tts"]["calls"] == 3
+    assert data["stages"]["merge"]["calls"] == 1
+    assert data["counters"]["tts_requests"] == 3
+    assert data["counters"]["tts_chars"] == len("einszweidrei")
+    assert data["counters"]["tts_bytes"] == sum(f.stat().st_size for f in files)
+    assert data["wall_seconds"] >= data["stages"]["merge"]["seconds"]
@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import auto_tts
+
+
+class FakeOpenAI:
+    """Stands in for ``OpenAI()``; answers slower for topics listed in *delays*."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.done = {}
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        topic = next(t for t in self.delays if t in prompt)
+        time.sleep(self.delays[topic])
+        self.done[topic] = time.perf_counter()
+        text = f"{topic} first paragraph.\n\n{topic} second paragraph."
+        message = SimpleNamespace(content=text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class FakeTTS:
+    def __init__(self, directory):
+        self.directory = directory
+        self.started = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, text, idx, basename, use_cache=True):
+        with self.lock:
+            self.started.setdefault(text.split()[0], time.perf_counter())
+        path = self.directory / f"{basename}_{idx:02d}.mp3"
+        path.write_text(text)
+        return path
+
+
+def test_run_topics_pipelines_and_keeps_topic_order(tmp_path):
+    client = FakeOpenAI({"Slow": 0.3, "Fast": 0.0})
+    tts = FakeTTS(tmp_path)
+
+    blocks = []
+    per_topic = auto_tts.run_topics(
+        ["Slow", "Fast"], "job", tmp_path, 45, max_chunk=30,
+        gpt_workers=2, workers=2, client=client, tts=tts, blocks=blocks,
+    )
+
+    assert [[f.read_text() for f in files] for files in per_topic] == blocks == [
+        ["Slow first paragraph.", "Slow second paragraph."],
+        ["Fast first paragraph.", "Fast second paragraph."],
+    ]
+    # TTS for the fast topic ran while the slow script was still being written
+    assert tts.started["Fast"] < client.done["Slow"]
+    assert (tmp_path / "slow.md").exists() and (tmp_path / "fast.md").exists()
+
+
+def test_run_topics_resume_skips_finished_work(tmp_path):
+    manifest = auto_tts.Manifest(tmp_path / "manifest.json")
+    client = FakeOpenAI({"Alpha": 0.0, "Beta": 0.0})
+    tts = FakeTTS(tmp_path)
+
+    def flaky(text, idx, basename, use_cache=True):
+        if text.startswith("Beta second"):
+            raise RuntimeError("ElevenLabs 500")
+        return tts(text, idx, basename, use_cache)
+
+    try:
+        auto_tts.run_topics(["Alpha", "Beta"], "job", tmp_path, 45, max_chunk=30,
+                            client=client, tts=flaky, manifest=manifest)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("first run should fail")
+
+    calls = []
+    client.chat.completions.create = lambda *a, **kw: calls.append("gpt")
+
+    def counting(text, idx, basename, use_cache=True):
+        calls.append(text)
+        return tts(text, idx, basename, use_cache)
+
+    resumed = auto_tts.Manifest(tmp_path / "manifest.json", resume=True)
+    per_topic = auto_tts.run_topics(["Alpha", "Beta"], "job", tmp_path, 45,
+                                    max_chunk=30, client=client, tts=counting,
+                                    manifest=resumed)
+
+    assert calls == ["Beta second paragraph."]
+    assert [len(files) for files in per_topic] == [2, 2]
+    assert resumed.data["topics"]["2"]["blocks"]["1"]["status"] == "done"
+
+
+class FakeStreamingOpenAI:
+    """Streams a fixed script in small pieces, like ``create(stream=True)``."""
+
+    def __init__(self, text, piece=7, delay=0.01):
+        self.text, self.piece, self.delay = text, piece, delay
+        self.sent = 0
+        self.closed = False
+        self.finished = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, stream=False, **kwargs):
+        assert stream
+        return self.chunks()
+
+    def chunks(self):
+        try:
+            for i in range(0, len(self.text), self.piece):
+                time.sleep(self.delay)
+                self.sent = i + self.piece
+                delta = SimpleNamespace(content=self.text[i:i + self.piece])
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+            usage = SimpleNamespace(prompt_tokens=10, completion_tokens=len(self.text) // 4)
+            yield SimpleNamespace(choices=[], usage=usage)
+            self.finished = time.perf_counter()
+        finally:
+            self.closed = True
+
+
+def test_run_topics_stream_starts_tts_before_script_is_complete(tmp_path):
+    text = "\n\n".join(f"Absatz {i} mit etwas Text." for i in range(6))
+    client = FakeStreamingOpenAI(text)
+    tts = FakeTTS(tmp_path)
+
+    blocks = []
+    per_topic = auto_tts.run_topics(["Strom"], "job", tmp_path, len(text), max_chunk=50,
+                                    client=client, tts=tts, stream=True, blocks=blocks)
+
+    expected = auto_tts.split_text_blocks(text, max_chars=50, window=1)
+    assert [f.read_text() for f in per_topic[0]] == expected
+    assert blocks == [expected]
+    assert tts.started["Absatz"] < client.finished
+    assert (tmp_path / "strom.md").read_text() == "\n\n".join(expected)
+
+
+def test_run_topics_stream_failure_cancels_queued_blocks(tmp_path):
+    text = "\n\n".join(f"Absatz {i} mit etwas Text." for i in range(6))
+
+    class Broken(FakeStreamingOpenAI):
+        def chunks(self):
+            yield from list(super().chunks())[:-1]  # the usage never arrives
+            raise RuntimeError("stream reset")
+
+    rendered = []
+
+    def slow(text, idx, basename, use_cache=True):
+        rendered.append(text)
+        time.sleep(0.2)
+        return tmp_path / f"{basename}_{idx:02d}.mp3"
+
+    try:
+        auto_tts.run_topics(["Strom"], "job", tmp_path, len(text), max_chunk=30,
+                            workers=1, client=Broken(text, delay=0), tts=slow, stream=True)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("the broken stream should fail the run")
+
+    # five blocks were queued before the stream broke; only the first one ran
+    assert rendered == ["Absatz 0 mit etwas Text."]
+
+
+def test_stream_script_blocks_stops_stream_when_too_long():
+    text = "\n\n".join(f"Absatz {i} mit etwas Text." for i in range(20))
+    client = FakeStreamingOpenAI(text, delay=0)
+
+    blocks = list(auto_tts.stream_script_blocks("Lang", 100, max_chars=50, client=client))
+
+    assert sum(map(len, blocks)) <= 100 * (1 + auto_tts.LENGTH_TOLERANCE)
+    assert client.closed and client.finished is None
+    assert client.sent < len(text) // 2
@@ -0,0 +1,81 @@
+import os
+import random
+import re
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+from auto_tts import _pack, _split_long, iter_text_blocks, split_text_blocks
+
+WORDS = ["the", "sea", "bishop", "was", "seen", "again", "near", "Copenhagen",
+         "fishermen", "whispered", "—", "nobody", "knew"]
+
+
+def random_text(rng, giant_words=False):
+    paras = []
+    for _ in range(rng.randint(1, 30)):
+        sentences = []
+        for _ in range(rng.randint(1, 40)):
+            words = rng.choices(WORDS, k=rng.randint(1, 25))
+            if giant_words and rng.random() < 0.05:
+                words.append("x" * rng.randint(50, 400))
+            sep = rng.choice([", ", " ", "; "])
+            sentences.append(sep.join(words) + rng.choice([".", "!", "?", '."']))
+        paras.append(" ".join(sentences))
+    return "\n\n".join(paras)
+
+
+def squash(text, sep=" "):
+    return re.sub(r"\s+", sep, text).strip()
+
+
+def test_blocks_respect_limit_and_round_trip():
+    rng = random.Random(1942)
+    for _ in range(200):
+        text = random_text(rng)
+        max_chars = rng.randint(80, 1500)
+        blocks = split_text_blocks(text, max_chars=max_chars)
+        assert all(0 < len(b) <= max_chars for b in blocks)
+        assert squash(" ".join(blocks)) == squash(text)
+
+
+def test_blocks_hard_split_words_longer_than_limit():
+    rng = random.Random(8)
+    for _ in range(100):
+        text = random_text(rng, giant_words=True)
+        max_chars = rng.randint(60, 300)
+        blocks = split_text_blocks(text, max_chars=max_chars)
+        assert all(0 < len(b) <= max_chars for b in blocks)
+        assert squash("".join(blocks), "") == squash(text, "")
+
+
+def test_blocks_are_minimal_and_balanced():
+    paras = ["a" * 900, "b" * 900, "c" * 100]
+    blocks = split_text_blocks("\n\n".join(paras), max_chars=1850)
+    assert len(blocks) == 2
+    # greedy packing would leave a lone 100 character block
+    assert [len(b) for b in blocks] == [900, 1002]
+
+    rng = random.Random(3)
+    for _ in range(100):
+        text = random_text(rng)
+        max_chars = max(200, len(text) // 6)
+        units = []
+        for para in text.split("\n\n"):
+            pieces = _split_long(para, max_chars)
+            pieces[0] = ("\n\n", pieces[0][1])
+            units.extend(pieces)
+        # within one window the block count is the greedy minimum
+        assert len(split_text_blocks(text, max_chars)) == len(_pack(units, max_chars))
+
+
+def test_oversized_paragraph_splits_at_sentences():
+    para = "First sentence is here. Second one follows! Third, with a clause; ends?"
+    blocks = split_text_blocks(para, max_chars=30)
+    assert blocks == ["First sentence is here.", "Second one follows!",
+                      "Third, with a clause; ends?"]
+
+
+def test_iter_text_blocks_streams_lines():
+    lines = iter(["one\n", "two\n", "\n", "three\n"])
+    assert list(iter_text_blocks(lines, max_chars=100)) == ["one\ntwo\n\nthree"]
@@ -21,5 +21,21 @@ def test_template():
     except KeyError as e:
         print(f"❌ Fehler: {e}")
 
+def test_prompt_split_keeps_placeholders_in_suffix():
+    import os
+
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    os.environ.setdefault("ELEVEN_API_KEY", "test")
+    from auto_tts import split_prompt_template
+
+    tmpl = "Intro with {{braces}}\n\nReference text\n\nWrite ~{char_target} chars about:\n\n{topic}\n"
+    prefix, suffix = split_prompt_template(tmpl)
+
+    assert prefix == "Intro with {braces}\n\nReference text"
+    assert "{" not in prefix.replace("{braces}", "")
+    assert suffix.format(topic="Sea Bishop", char_target=6000) == (
+        "Write ~6000 chars about:\n\nSea Bishop"
+    )
+
 if __name__ == "__main__":
-    test_template()
\ No newline at end of file
+    test_template()
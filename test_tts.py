@@ -0,0 +1,213 @@
+import json
+import os
+import sys
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import auto_tts
+
+
+class StubEleven(BaseHTTPRequestHandler):
+    """Fake ElevenLabs endpoint: echoes the text back after some latency.
+
+    The first request for every text is answered with 429 so the client has
+    to back off and retry.
+    """
+
+    latency = 0.05
+    lock = threading.Lock()
+    seen = set()
+    active = 0
+    peak = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        text = body["text"]
+        cls = type(self)
+        with cls.lock:
+            first = text not in cls.seen
+            cls.seen.add(text)
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            time.sleep(cls.latency)
+            if first:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                return
+            data = b"ID3" + text.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def test_tts_blocks_concurrent_and_ordered(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubEleven)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        monkeypatch.setattr(auto_tts, "ELEVEN_API", f"http://127.0.0.1:{server.server_port}")
+        monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+        monkeypatch.setattr(auto_tts, "TTS_CACHE", auto_tts.TTSCache(tmp_path / "cache", 1 << 20))
+        monkeypatch.setattr(auto_tts, "TTS_MIN_BYTES", 4)
+
+        blocks = [f"block {i}" for i in range(8)]
+        files = auto_tts.tts_blocks(blocks, "stub", start=1, workers=3)
+    finally:
+        server.shutdown()
+
+    assert [f.name for f in files] == [f"stub_{i:02d}.mp3" for i in range(1, 9)]
+    assert [f.read_bytes() for f in files] == [b"ID3" + b.encode() for b in blocks]
+    assert not list(tmp_path.glob("*.part"))
+    assert 1 < StubEleven.peak <= 3
+
+
+def test_tts_cache_hit_skips_request(tmp_path, monkeypatch):
+    cache = auto_tts.TTSCache(tmp_path / "cache", 1 << 20)
+    monkeypatch.setattr(auto_tts, "TTS_CACHE", cache)
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+
+    key = cache.key("hello", auto_tts.VOICE_ID, auto_tts.TTS_MODEL, auto_tts.VOICE_SETTINGS)
+    src = tmp_path / "src.mp3"
+    src.write_bytes(b"cached audio")
+    cache.store(key, src)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache hit must not call the API")
+
+    monkeypatch.setattr(auto_tts, "request", fail)
+    fn = auto_tts.tts_chunk("hello", 3, "cached")
+    assert fn.read_bytes() == b"cached audio"
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_tts_cache_prune_evicts_least_recently_used(tmp_path):
+    cache = auto_tts.TTSCache(tmp_path, 25)
+    for i, name in enumerate(("old", "mid", "new")):
+        path = cache.path(name)
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (i, i))
+
+    assert cache.prune() == 1
+    assert sorted(f.stem for f in tmp_path.glob("*.mp3")) == ["mid", "new"]
+
+
+def test_tts_chunk_rejects_non_mp3_response(tmp_path, monkeypatch):
+    class Response:
+        status_code = 200
+        headers = {}
+        text = ""
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            yield b"<html>" + b"x" * 1024
+
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    monkeypatch.setattr(auto_tts, "request", lambda *a, **kw: Response())
+
+    with pytest.raises(ValueError):
+        auto_tts.tts_chunk("broken", 0, "bad", use_cache=False)
+    assert not list(tmp_path.iterdir())
+
+
+def test_tts_chunk_retries_broken_streams_only(tmp_path, monkeypatch):
+    import requests
+
+    calls = []
+
+    class Response:
+        status_code = 200
+        headers = {}
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            yield b"ID3" + bytes(1024)
+            if len(calls) == 1:
+                raise requests.exceptions.ChunkedEncodingError("connection reset")
+            yield bytes(1024)
+
+    def fake_request(*args, **kwargs):
+        calls.append(kwargs["json"]["text"])
+        if kwargs["json"]["text"] == "down":  # request() has given up already
+            raise requests.ConnectionError("host down")
+        return Response()
+
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    monkeypatch.setattr(auto_tts, "request", fake_request)
+
+    fn = auto_tts.tts_chunk("stream", 0, "broken", use_cache=False, backoff=0)
+    assert len(calls) == 2 and fn.stat().st_size == 3 + 2048
+
+    calls.clear()
+    with pytest.raises(requests.ConnectionError):
+        auto_tts.tts_chunk("down", 1, "broken", use_cache=False, backoff=0)
+    assert calls == ["down"]
+
+
+def test_tts_chunk_reraises_errors_after_a_partial_read(tmp_path, monkeypatch):
+    import requests
+
+    class Response:
+        status_code = 200
+        headers = {}
+
+        @property
+        def text(self):
+            raise RuntimeError("The content for this response was already consumed")
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            yield b"ID3" + bytes(1024)
+            raise requests.exceptions.ContentDecodingError("bad gzip")
+
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    monkeypatch.setattr(auto_tts, "request", lambda *a, **kw: Response())
+
+    with pytest.raises(requests.exceptions.ContentDecodingError):
+        auto_tts.tts_chunk("partial", 0, "bad", use_cache=False)
+    assert not list(tmp_path.iterdir())
+
+
+def test_fake_backend_writes_silence_proportional_to_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    short = auto_tts.tts_chunk("x" * 70, 0, "fake", backend="fake")
+    long = auto_tts.tts_chunk("x" * 700, 1, "fake", backend="fake")
+
+    with wave.open(str(short)) as a, wave.open(str(long)) as b:
+        assert b.getnframes() == 10 * a.getnframes()
+        assert a.getnframes() / a.getframerate() == pytest.approx(70 * 60 / auto_tts.CHARS_PER_MIN)
+
+
+def test_command_backend_pipes_text_to_local_engine(tmp_path, monkeypatch):
+    script = "import sys; open(sys.argv[1], 'wb').write(b'RIFF' + sys.stdin.buffer.read())"
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    monkeypatch.setattr(auto_tts, "TTS_CACHE", auto_tts.TTSCache(tmp_path / "cache", 1 << 20))
+    monkeypatch.setattr(auto_tts, "TTS_COMMAND", f'"{sys.executable}" -c "{script}" {{out}}')
+
+    fn = auto_tts.tts_chunk("offline", 4, "local", backend="command")
+    assert fn.name == "local_04.wav"
+    assert fn.read_bytes() == b"RIFFoffline"
+    assert auto_tts.TTS_CACHE.path(
+        auto_tts.TTSCache.key("offline", "command", auto_tts.TTS_COMMAND, {}), ".wav"
+    ).exists()
@@ -0,0 +1,98 @@
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ELEVEN_API_KEY", "test")
+
+import pytest
+
+import auto_tts
+
+
+@pytest.fixture
+def usage(monkeypatch):
+    usage = auto_tts.Usage()
+    monkeypatch.setattr(auto_tts, "USAGE", usage)
+    return usage
+
+
+def test_ledger_books_calls_per_project(tmp_path, usage):
+    usage.record("gpt", "Sea Bishop", prompt_tokens=1000, cached_tokens=400,
+                 completion_tokens=200, cost=auto_tts.gpt_cost(1000, 200, 400))
+    usage.record("tts", "sea-bishop", chars=2000, cost=auto_tts.tts_cost(2000, "elevenlabs"))
+    usage.record("tts", "sea-bishop", chars=500, cached=True,
+                 saved=auto_tts.tts_cost(500, "elevenlabs"))
+    usage.record("tts", "kraken", chars=100, cost=0.03)
+
+    ledger = tmp_path / "ledger.jsonl"
+    run = usage.flush(ledger, "sea-bishop")
+    usage.flush(ledger, "sea-bishop")  # nothing left to book
+
+    assert run == {
+        "tts_chars": 2000, "tts_cached_chars": 500, "prompt_tokens": 1000,
+        "cached_tokens": 400, "completion_tokens": 200,
+        # 600 * 2.50 + 400 * 1.25 + 200 * 10.00 per million, 2000 * 0.30 per 1000
+        "cost": round(0.004 + 0.6, 4), "saved": 0.15,
+    }
+    assert len(auto_tts.read_ledger(ledger)) == 3
+    assert usage.chars == 2100 and len(usage.entries) == 4
+
+
+def test_budget_refuses_new_tts_but_keeps_cache_hits(tmp_path, monkeypatch, usage):
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    usage.reset(max_chars=100)
+
+    auto_tts.tts_chunk("x" * 70, 0, "budget", backend="fake")
+    with pytest.raises(auto_tts.BudgetExceeded):
+        auto_tts.tts_chunk("y" * 70, 1, "budget", backend="fake")
+
+    assert [f.name for f in tmp_path.iterdir()] == ["budget_00.wav"]
+    assert usage.chars == 70
+
+
+def test_budget_halts_topics_and_resume_finishes(tmp_path, monkeypatch, usage):
+    from test_pipeline import FakeOpenAI
+
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    monkeypatch.setattr(auto_tts, "TTS_BACKEND", "fake")
+    manifest = auto_tts.Manifest(tmp_path / "manifest.json")
+    client = FakeOpenAI({"Alpha": 0.0, "Beta": 0.0})
+    usage.reset(max_chars=50)
+
+    with pytest.raises(auto_tts.BudgetExceeded):
+        auto_tts.run_topics(["Alpha", "Beta"], "job", tmp_path, 45, max_chunk=30,
+                            workers=1, client=client, manifest=manifest)
+    assert usage.chars <= 50
+
+    usage.reset()
+    resumed = auto_tts.Manifest(tmp_path / "manifest.json", resume=True)
+    per_topic = auto_tts.run_topics(["Alpha", "Beta"], "job", tmp_path, 45, max_chunk=30,
+                                    client=client, manifest=resumed)
+    assert [len(files) for files in per_topic] == [2, 2]
+    assert 0 < usage.chars < 4 * 25
+
+
+def test_preflight_rejects_runs_over_budget(usage):
+    usage.reset(max_cost=1.0)
+    estimate = auto_tts.estimate_usage(10_000, scripts=2, char_target=5000)
+    assert estimate["completion_tokens"] == 2 * 5000 // auto_tts.CHARS_PER_TOKEN
+
+    with pytest.raises(auto_tts.BudgetExceeded):
+        auto_tts.preflight(estimate)  # 10k ElevenLabs characters alone cost $3
+    auto_tts.preflight(auto_tts.estimate_usage(1000))
+
+
+def test_estimate_topics_skips_finished_work(tmp_path, monkeypatch, usage):
+    from test_pipeline import FakeOpenAI
+
+    monkeypatch.setattr(auto_tts, "PARTS_DIR", tmp_path)
+    monkeypatch.setattr(auto_tts, "TTS_BACKEND", "fake")
+    manifest = auto_tts.Manifest(tmp_path / "manifest.json")
+    auto_tts.run_topics(["Alpha"], "job", tmp_path, 45, max_chunk=30,
+                        client=FakeOpenAI({"Alpha": 0.0}), manifest=manifest)
+
+    resumed = auto_tts.Manifest(tmp_path / "manifest.json", resume=True)
+    estimate = auto_tts.estimate_topics(["Alpha", "Beta"], 45, max_chunk=30,
+                                        manifest=resumed)
+
+    # only Beta is left: one script and its characters
+    assert estimate == auto_tts.estimate_usage(45, 1, 45)